@@ -1,6 +1,6 @@
-from flask import Flask, request, jsonify
+from flask import Flask, request, jsonify, Response
 from flask_cors import CORS
-from database import get_db_connection, init_db
+from database import get_db_connection, init_db, WriteBehindQueue
 import sqlite3
 import uuid
 import keras
@@ -9,19 +9,32 @@ import numpy as np
 import pandas as pd
 import os
 import requests
-from sklearn.preprocessing import MinMaxScaler
 from datetime import datetime, timedelta
 import threading
 import time
-from data_sync import run_sync, HOURLY_PATH, DAILY_PATH, FILE_MAP
+from data_sync import run_sync, HOURLY_PATH, DAILY_PATH, FILE_MAP, candle_store
+from price_window import PriceWindowCache, read_tail
+from price_store import CLOSE
+from model_registry import ModelRegistry, parse_preload_targets
+from batcher import MicroBatcher
+from scaling import AffineScaler
+from prediction_cache import PredictionCache
+from backtest import BacktestCache, BACKTEST_WINDOWS, load_history, score_predictions, walk_forward
+from history_cache import HistoryCache, choose_encoding, lttb
+from serialization import init_app as init_serialization
+from retention import run_retention
 
 app = Flask(__name__)
 CORS(app)  # Enable CORS for frontend integration
+# orjson-backed jsonify (NumPy arrays included) and gzip for large JSON bodies
+init_serialization(app)
 
 # Absolute paths to ensure it works from any directory
 BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 MODEL_PATH = os.path.join(BASE_DIR, "milestone-2", "infosys", "outputs", "models")
+SCALER_PATH = os.path.join(BASE_DIR, "milestone-2", "infosys", "outputs", "scalers")
 USD_TO_INR = 88.19
+WINDOW_SIZE = 60  # LSTM input length
 
 # Coin mapping (same as in milestone-2/main.py)
 MODEL_NAME_MAP = {
@@ -37,44 +50,91 @@ MODEL_NAME_MAP = {
     "BNB": "BINANCE_INR",
 }
 
-models = {
-    "hourly": {},
-    "daily": {}
+# Daily models for these coins were saved under a different name
+MODEL_NAME_OVERRIDES = {
+    "daily": {
+        "LINK": "CHAINLINK_COIN_INR",
+        "BNB": "BINANCE_COIN_INR",
+    }
 }
 
+# Preload configuration: "all", "none" or e.g. "BTC,ETH:daily"
+PRELOAD_MODELS = os.environ.get("PRELOAD_MODELS", "all")
+PRELOAD_WORKERS = int(os.environ.get("PRELOAD_WORKERS", 4))
+# Stay below gunicorn's 30s worker boot timeout; the rest loads in background
+PRELOAD_BUDGET_SECONDS = float(os.environ.get("PRELOAD_BUDGET_SECONDS", 20))
+
+registry = ModelRegistry(MODEL_PATH, MODEL_NAME_MAP, MODEL_NAME_OVERRIDES, scaler_dir=SCALER_PATH)
+
+# Concurrent /predict calls for the same model share one forward pass.
+# BATCH_MAX_WAIT_MS=0 turns batching off.
+BATCH_MAX_SIZE = int(os.environ.get("BATCH_MAX_SIZE", 32))
+BATCH_MAX_WAIT_MS = float(os.environ.get("BATCH_MAX_WAIT_MS", 5))
+batcher = MicroBatcher(BATCH_MAX_SIZE, BATCH_MAX_WAIT_MS)
+
 def get_model(timeframe, coin):
-    if coin in models[timeframe]:
-        return models[timeframe][coin]
-    
-    # Try to load if not cached
-    mapped_name = MODEL_NAME_MAP.get(coin)
-    if not mapped_name:
-        return None
-    
-    model_file = f"{mapped_name}.keras"
-    model_path = os.path.join(MODEL_PATH, timeframe, model_file)
-    
-    if os.path.exists(model_path):
-        print(f"📦 Lazy loading {timeframe} model for {coin} from {model_file}...")
-        try:
-            model = keras.models.load_model(model_path)
-            models[timeframe][coin] = model
-            return model
-        except Exception as e:
-            print(f"❌ Error loading model: {e}")
-            return None
-    return None
+    return registry.get(timeframe, coin)
+
+# Last WINDOW_SIZE candles per (coin, timeframe), refreshed when the CSV changes
+price_windows = PriceWindowCache(WINDOW_SIZE)
+
+def get_data_path(coin, timeframe):
+    folder = HOURLY_PATH if timeframe == "hourly" else DAILY_PATH
+    file_prefix = FILE_MAP.get(coin.upper(), coin.lower() + "_inr")
+    return os.path.join(folder, f"{file_prefix}_{timeframe}.csv")
+
+# Model outputs per (coin, timeframe, last candle TIMESTAMP)
+PREDICTION_CACHE_SIZE = int(os.environ.get("PREDICTION_CACHE_SIZE", 256))
+prediction_cache = PredictionCache(PREDICTION_CACHE_SIZE)
+
+# Walk-forward backtest per (coin, timeframe), recomputed when a candle arrives
+backtests = BacktestCache()
+
+# Serialised /history payloads, rebuilt when the candles behind them change.
+# Ranges longer than `points` are LTTB-downsampled.
+HISTORY_CACHE_SIZE = int(os.environ.get("HISTORY_CACHE_SIZE", 64))
+HISTORY_DEFAULT_POINTS = int(os.environ.get("HISTORY_DEFAULT_POINTS", 1000))
+HISTORY_MAX_POINTS = int(os.environ.get("HISTORY_MAX_POINTS", 5000))
+HISTORY_MAX_AGE = int(os.environ.get("HISTORY_MAX_AGE", 60))
+history_cache = HistoryCache(HISTORY_CACHE_SIZE)
 
 # Initialize Database
 init_db()
 
+# Prediction rows are logged off the request path, batched into one transaction.
+# PREDICTION_LOG_DELAY_MS=0 writes synchronously.
+PREDICTION_LOG_DELAY_MS = float(os.environ.get("PREDICTION_LOG_DELAY_MS", 50))
+PREDICTION_LOG_BATCH = int(os.environ.get("PREDICTION_LOG_BATCH", 500))
+prediction_log = WriteBehindQueue(
+    "INSERT INTO predictions (user_id, coin, timeframe, current_price, predicted_price, confidence, timestamp, candle_ts, horizon) "
+    "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+    max_batch=PREDICTION_LOG_BATCH,
+    max_delay=PREDICTION_LOG_DELAY_MS / 1000,
+)
+
+# Warm up models before the worker starts taking traffic
+registry.preload(
+    parse_preload_targets(PRELOAD_MODELS, MODEL_NAME_MAP),
+    max_workers=PRELOAD_WORKERS,
+    budget=PRELOAD_BUDGET_SECONDS,
+)
+
 @app.route("/health")
 def health():
     return "ok"
 
-@app.route("/api/auth/google", methods=["POST"])
-def google_auth():
-    data = request.get_json()
+@app.route("/health/ready")
+def health_ready():
+    """Readiness probe: 503 until every preloaded model is warm."""
+    status = registry.status()
+    return jsonify(status), 200 if status["ready"] else 503
+
+@app.route("/health/cache")
+def health_cache():
+    return jsonify(prediction_cache.stats())
+
+def login_user(data):
+    """Find or create the user behind a Google sign-in payload."""
     email = data.get("email")
     name = data.get("name")
     avatar = data.get("avatar")
@@ -95,110 +155,407 @@ def google_auth():
     user = cursor.execute("SELECT * FROM users WHERE email = ?", (email,)).fetchone()
     conn.close()
     
-    return jsonify({
+    return {
         "success": True,
         "user": dict(user)
-    })
+    }
 
-@app.route("/api/user/stats/<user_id>")
-def get_user_stats(user_id):
+@app.route("/api/auth/google", methods=["POST"])
+def google_auth():
+    return jsonify(login_user(request.get_json()))
+
+def user_stats(user_id):
     conn = get_db_connection()
     cursor = conn.cursor()
     
-    total = cursor.execute("SELECT COUNT(*) FROM predictions WHERE user_id = ?", (user_id,)).fetchone()[0]
-    # Simulate accuracy for now, in a real app we'd compare with historical data later
-    accuracy = 85 if total > 0 else 0 
-    
+    # Trigger-maintained summary: one row lookup however many predictions exist.
+    # is_correct (and so correct/scored) is filled in by the scoring job.
+    stats = cursor.execute(
+        "SELECT total, scored, correct FROM user_stats WHERE user_id = ?", (user_id,)
+    ).fetchone()
+    total, scored, correct = tuple(stats) if stats else (0, 0, 0)
+    accuracy = round(100.0 * correct / scored, 1) if scored else 0
+
+    # Last RECENT_PREDICTIONS rows via the ring table, each a primary-key lookup
     predictions = cursor.execute(
-        "SELECT * FROM predictions WHERE user_id = ? ORDER BY timestamp DESC LIMIT 10", 
+        "SELECT p.* FROM user_recent_predictions r JOIN predictions p ON p.id = r.prediction_id "
+        "WHERE r.user_id = ? ORDER BY p.timestamp DESC, p.id DESC",
         (user_id,)
     ).fetchall()
     
     conn.close()
     
-    return jsonify({
+    return {
         "success": True,
         "totalPredictions": total,
         "accuracyRate": accuracy,
+        "scoredPredictions": scored,
         "history": [dict(p) for p in predictions]
-    })
+    }
+
+@app.route("/api/user/stats/<user_id>")
+def get_user_stats(user_id):
+    return jsonify(user_stats(user_id))
+
+class PredictionError(Exception):
+    def __init__(self, message, status=400):
+        super().__init__(message)
+        self.status = status
+
+# Upper bound on pairs accepted by /predict/batch
+MAX_BATCH_PAIRS = 50
+# Longest forecast path per timeframe, matching the UI's "Next 24 Hours" / "Next 30 Days"
+MAX_HORIZON = {"hourly": 24, "daily": 30}
+
+def parse_horizon(value, timeframe):
+    if timeframe not in MAX_HORIZON:
+        raise PredictionError(f"timeframe must be one of {', '.join(MAX_HORIZON)}", 400)
+    try:
+        horizon = int(value or 1)
+    except (TypeError, ValueError):
+        raise PredictionError("horizon must be an integer", 400)
+    if not 1 <= horizon <= MAX_HORIZON[timeframe]:
+        raise PredictionError(f"{timeframe} horizon must be between 1 and {MAX_HORIZON[timeframe]}", 400)
+    return horizon
+
+def parse_pair(pair):
+    """(COIN, timeframe, horizon) for one /predict/batch entry; PredictionError(400) if malformed."""
+    if not isinstance(pair, dict):
+        raise PredictionError("Each pair must be an object", 400)
+    coin = pair.get("coin", "BTC")
+    timeframe = pair.get("timeframe", "hourly")
+    if not isinstance(coin, str) or not isinstance(timeframe, str):
+        raise PredictionError("coin and timeframe must be strings", 400)
+    return coin.upper(), timeframe, parse_horizon(pair.get("horizon", 1), timeframe)
+
+def read_candles(coin, timeframe, n):
+    """Timestamps and closes of the last n candles, from the binary store when imported."""
+    series = candle_store.series(timeframe, FILE_MAP.get(coin, coin.lower() + "_inr"))
+    if series.exists():
+        timestamps, ohlcv = series.tail(n)
+        return timestamps, ohlcv[:, CLOSE]
+
+    # Data source selection (local sync CSV)
+    file_path = get_data_path(coin, timeframe)
+    if not os.path.exists(file_path):
+        raise PredictionError(f"Data file for {coin} not found", 404)
+    if n > WINDOW_SIZE:
+        # Longer than the cached window (backtests): read just the file's tail
+        df = read_tail(file_path, n)
+    else:
+        df = price_windows.get((coin, timeframe), file_path).tail(n)
+    return df["TIMESTAMP"].values, df["CLOSE"].values
+
+def load_window(coin, timeframe):
+    """Resolve the model and the last WINDOW_SIZE (timestamps, closes) for a coin/timeframe."""
+    model = get_model(timeframe, coin)
+    if not model:
+        raise PredictionError(f"Model for {coin} ({timeframe}) not found", 400)
+
+    timestamps, closes = read_candles(coin, timeframe, WINDOW_SIZE)
+    if len(closes) < WINDOW_SIZE:
+        raise PredictionError(f"Insufficient data (need {WINDOW_SIZE}, have {len(closes)})", 400)
+    return model, timestamps, closes
+
+def prepare_input(closes, scaler=None):
+    close_prices = np.asarray(closes, dtype=np.float64).reshape(-1, 1)
+
+    # Scale with the training-time scaler; fit on the window only if it is missing
+    if scaler is None:
+        scaler = AffineScaler.fit(close_prices)
+    scaled_data = scaler.transform(close_prices)
+
+    # Prepare last 60 timesteps
+    X_input = np.array([scaled_data[-WINDOW_SIZE:]]).reshape((1, WINDOW_SIZE, 1))
+    return close_prices, scaler, X_input
+
+def run_model(model, key, X_input, horizon):
+    if horizon == 1:
+        # Compiled forward pass, batched with concurrent requests
+        return batcher.predict(key, model, X_input)
+    return model.forecast(X_input, horizon)
+
+def model_output(close_prices, scaler, predicted_scaled, candle_ts):
+    """predicted_scaled is (1, steps); the last step is the target price."""
+    predicted_path = scaler.inverse_transform(predicted_scaled.reshape(-1, 1)).ravel()
+    output = {
+        "candleTimestamp": int(candle_ts),
+        "currentPrice": float(close_prices[-1][0]),
+        "predictedPrice": float(predicted_path[-1]),
+        "historicalData": close_prices.ravel(),
+    }
+    if len(predicted_path) > 1:
+        output["predictedPath"] = predicted_path
+    return output
+
+def build_result(coin, timeframe, output):
+    result = {
+        "success": True,
+        "coin": coin,
+        "timeframe": timeframe,
+        "currentPrice": output["currentPrice"],
+        "predictedPrice": output["predictedPrice"],
+        "historicalData": output["historicalData"], # Added for frontend charts
+        "candleTimestamp": output["candleTimestamp"],
+        "confidence": 85,
+        "timestamp": datetime.now().isoformat(),
+        "status": "Live Data Connected",
+        "version": "2.1"
+    }
+    if "predictedPath" in output:
+        result["horizon"] = len(output["predictedPath"])
+        result["predictedPath"] = output["predictedPath"]
+    return result
+
+def save_predictions(user_id, results):
+    """Queue prediction rows for the write-behind logger; the request doesn't wait on the DB."""
+    prediction_log.submit(
+        (user_id, r["coin"], r["timeframe"], r["currentPrice"], r["predictedPrice"], int(r["confidence"]), r["timestamp"],
+         r["candleTimestamp"], r.get("horizon", 1))
+        for r in results
+    )
+
+def predict_one(data):
+    """Prediction result for a /predict body; raises PredictionError for bad input."""
+    coin = data.get("coin", "BTC").upper()
+    timeframe = data.get("timeframe", "hourly") # "hourly" or "daily"
+    user_id = data.get("user_id", "anonymous")
+    horizon = parse_horizon(data.get("horizon", 1), timeframe) # steps ahead, 1 = next candle
+
+    model, timestamps, closes = load_window(coin, timeframe)
+
+    # Same last candle -> same input window -> same prediction
+    cache_key = (coin, timeframe, int(timestamps[-1]), horizon)
+    output = prediction_cache.get(cache_key)
+
+    if output is None:
+        close_prices, scaler, X_input = prepare_input(closes, registry.get_scaler(timeframe, coin))
+        # Prediction
+        predicted_scaled = run_model(model, (timeframe, coin), X_input, horizon)
+        output = model_output(close_prices, scaler, predicted_scaled, timestamps[-1])
+        prediction_cache.put(cache_key, output)
+
+    # Prepare Response Object FIRST
+    prediction_result = build_result(coin, timeframe, output)
+
+    # Save to DB using the result object
+    save_predictions(user_id, [prediction_result])
+
+    return prediction_result
 
 @app.route("/predict", methods=["POST"])
 def predict():
     print("📥 Received prediction request")
+    try:
+        return jsonify(predict_one(request.get_json()))
+
+    except PredictionError as e:
+        return jsonify({"error": str(e)}), e.status
+    except Exception as e:
+        print(f"❌ Prediction Error: {e}")
+        return jsonify({"error": str(e)}), 500
+
+@app.route("/predict/batch", methods=["POST"])
+def predict_batch():
+    """
+    Predict several (coin, timeframe) pairs in one call.
+
+    Body: {"pairs": [{"coin": "BTC", "timeframe": "hourly", "horizon": 1}, ...], "user_id": "..."}
+    Pairs that fail are reported in place with "success": false.
+    """
+    print("📥 Received batch prediction request")
     try:
         data = request.get_json()
-        coin = data.get("coin", "BTC").upper()
-        timeframe = data.get("timeframe", "hourly") # "hourly" or "daily"
+        pairs = data.get("pairs") or []
         user_id = data.get("user_id", "anonymous")
-        
+
+        if not pairs:
+            return jsonify({"error": "No pairs given"}), 400
+        if not isinstance(pairs, list):
+            return jsonify({"error": "pairs must be a list"}), 400
+        if len(pairs) > MAX_BATCH_PAIRS:
+            return jsonify({"error": f"Too many pairs (max {MAX_BATCH_PAIRS})"}), 400
+
+        # Normalised keys, so "1" and 1 share a forward pass
+        keys = [parse_pair(p) for p in pairs]
+        outputs = {}
+        errors = {}
+        pending = {}
+
+        # Assemble every input window, skipping pairs already in the cache
+        for key in dict.fromkeys(keys):
+            coin, timeframe, horizon = key
+            try:
+                model, timestamps, closes = load_window(coin, timeframe)
+            except PredictionError as e:
+                errors[key] = str(e)
+                continue
+
+            cache_key = (coin, timeframe, int(timestamps[-1]), horizon)
+            output = prediction_cache.get(cache_key)
+            if output is not None:
+                outputs[key] = output
+            else:
+                pending[key] = (model, cache_key, horizon, prepare_input(closes, registry.get_scaler(timeframe, coin)))
+
+        # One forward pass per model: its windows are stacked and rolled out to
+        # the longest horizon asked of it; shorter horizons take a prefix
+        by_model = {}
+        for key, (model, *_rest) in pending.items():
+            by_model.setdefault(id(model), []).append(key)
+        for group in by_model.values():
+            model = pending[group[0]][0]
+            X_batch = np.concatenate([pending[key][3][2] for key in group])
+            paths = model.forecast(X_batch, max(pending[key][2] for key in group))
+            for key, path in zip(group, paths):
+                _, cache_key, horizon, (close_prices, scaler, _) = pending[key]
+                output = model_output(close_prices, scaler, path[None, :horizon], cache_key[2])
+                prediction_cache.put(cache_key, output)
+                outputs[key] = output
+
+        results = []
+        for key in keys:
+            coin, timeframe, _ = key
+            if key in outputs:
+                results.append(build_result(coin, timeframe, outputs[key]))
+            else:
+                results.append({"success": False, "coin": coin, "timeframe": timeframe, "error": errors[key]})
+
+        saved = [r for r in results if r["success"]]
+        if saved:
+            save_predictions(user_id, saved)
+
+        return jsonify({
+            "success": True,
+            "predictions": results
+        })
+
+    except PredictionError as e:
+        return jsonify({"error": str(e)}), e.status
+    except Exception as e:
+        print(f"❌ Batch Prediction Error: {e}")
+        return jsonify({"error": str(e)}), 500
+
+@app.route("/api/backtest/<coin>/<timeframe>")
+def backtest(coin, timeframe):
+    """Walk-forward next-candle backtest of the served model over recent history."""
+    coin = coin.upper()
+    try:
         model = get_model(timeframe, coin)
         if not model:
-            return jsonify({"error": f"Model for {coin} ({timeframe}) not found"}), 400
+            raise PredictionError(f"Model for {coin} ({timeframe}) not found", 400)
+        timestamps, closes = read_candles(coin, timeframe, BACKTEST_WINDOWS + WINDOW_SIZE)
+        if len(closes) <= WINDOW_SIZE:
+            raise PredictionError(f"Insufficient data (need more than {WINDOW_SIZE}, have {len(closes)})", 400)
 
-        # Data source selection (local sync CSV)
-        folder = HOURLY_PATH if timeframe == "hourly" else DAILY_PATH
-        file_prefix = FILE_MAP.get(coin.upper(), coin.lower() + "_inr")
-        filename = f"{file_prefix}_{timeframe}.csv"
-        file_path = os.path.join(folder, filename)
+        result = backtests.get(
+            (coin, timeframe),
+            int(timestamps[-1]),
+            lambda: walk_forward(model, registry.get_scaler(timeframe, coin), timestamps, closes, WINDOW_SIZE),
+        )
+        return jsonify({"success": True, "coin": coin, "timeframe": timeframe, **result})
 
-        if not os.path.exists(file_path):
-             return jsonify({"error": f"Data file for {coin} not found"}), 404
-             
-        df_full = pd.read_csv(file_path)
-        df = df_full.tail(60) 
-        
-        if len(df) < 60:
-             return jsonify({"error": f"Insufficient data (need 60, have {len(df)})"}), 400
+    except PredictionError as e:
+        return jsonify({"error": str(e)}), e.status
+    except Exception as e:
+        print(f"❌ Backtest Error: {e}")
+        return jsonify({"error": str(e)}), 500
 
-        close_prices = df["CLOSE"].values.reshape(-1, 1)
+def history_version(coin, timeframe):
+    """Cheap fingerprint of a series that changes whenever the sync appends to it."""
+    series = candle_store.series(timeframe, FILE_MAP.get(coin, coin.lower() + "_inr"))
+    if series.exists():
+        return ("store", len(series))
+    file_path = get_data_path(coin, timeframe)
+    if not os.path.exists(file_path):
+        raise PredictionError(f"Data file for {coin} not found", 404)
+    stat = os.stat(file_path)
+    return (stat.st_mtime_ns, stat.st_size)
 
-        # Scale
-        scaler = MinMaxScaler(feature_range=(0, 1))
-        scaled_data = scaler.fit_transform(close_prices)
+def build_history(coin, timeframe, candles, points):
+    timestamps, closes = load_history(coin, timeframe)
+    if candles:
+        timestamps, closes = timestamps[-candles:], closes[-candles:]
+    kept = lttb(timestamps, closes, points)
+    return {
+        "success": True,
+        "coin": coin,
+        "timeframe": timeframe,
+        "candles": int(len(timestamps)),
+        "points": int(len(kept)),
+        "timestamps": np.asarray(timestamps)[kept],
+        "prices": np.asarray(closes)[kept],
+    }
 
-        # Prepare last 60 timesteps
-        X_input = np.array([scaled_data[-60:]]).reshape((1, 60, 1))
+@app.route("/history/<coin>/<timeframe>")
+def history(coin, timeframe):
+    """
+    Close prices for charts: ?candles=N limits to the last N candles (default all),
+    ?points=M downsamples to at most M points. Supports If-None-Match and gzip/br.
+    """
+    coin = coin.upper()
+    try:
+        if timeframe not in ("hourly", "daily"):
+            raise PredictionError("timeframe must be hourly or daily", 400)
+        try:
+            candles = max(int(request.args.get("candles", 0)), 0)
+            points = int(request.args.get("points", HISTORY_DEFAULT_POINTS))
+        except ValueError:
+            raise PredictionError("candles and points must be integers", 400)
+        if not 3 <= points <= HISTORY_MAX_POINTS:
+            raise PredictionError(f"points must be between 3 and {HISTORY_MAX_POINTS}", 400)
 
-        # Prediction
-        predicted_scaled = model.predict(X_input)
-        predicted_price = scaler.inverse_transform(predicted_scaled)[0][0]
-        
-        # Prepare Response Object FIRST
-        prediction_result = {
-            "success": True,
-            "coin": coin,
-            "timeframe": timeframe,
-            "currentPrice": float(close_prices[-1][0]),
-            "predictedPrice": float(predicted_price),
-            "historicalData": close_prices.flatten().tolist(), # Added for frontend charts
-            "confidence": 85,
-            "timestamp": datetime.now().isoformat(),
-            "status": "Live Data Connected",
-            "version": "2.1"
-        }
-
-        # Save to DB using the result object
-        conn = get_db_connection()
-        conn.execute(
-            "INSERT INTO predictions (user_id, coin, timeframe, current_price, predicted_price, confidence, timestamp) VALUES (?, ?, ?, ?, ?, ?, ?)",
-            (user_id, coin, timeframe, prediction_result["currentPrice"], prediction_result["predictedPrice"], 
-             int(prediction_result["confidence"]), prediction_result["timestamp"])
+        payload = history_cache.get(
+            (coin, timeframe, candles, points),
+            history_version(coin, timeframe),
+            lambda: build_history(coin, timeframe, candles, points),
         )
-        conn.commit()
-        conn.close()
 
-        return jsonify(prediction_result)
-        
+        if request.if_none_match.contains(payload.etag):
+            response = Response(status=304)
+        else:
+            encoding = choose_encoding(request.accept_encodings)
+            response = Response(payload.encoded(encoding), mimetype="application/json")
+            if encoding:
+                response.headers["Content-Encoding"] = encoding
+        response.set_etag(payload.etag)
+        response.headers["Cache-Control"] = f"public, max-age={HISTORY_MAX_AGE}"
+        response.headers["Vary"] = "Accept-Encoding"
+        return response
+
+    except PredictionError as e:
+        return jsonify({"error": str(e)}), e.status
     except Exception as e:
-        print(f"❌ Prediction Error: {e}")
+        print(f"❌ History Error: {e}")
         return jsonify({"error": str(e)}), 500
 
+def score_pending_predictions():
+    conn = get_db_connection()
+    try:
+        scored = score_predictions(conn)
+    finally:
+        conn.close()
+    if scored:
+        print(f"✅ Scored {scored} past predictions")
+
+def apply_retention():
+    conn = get_db_connection()
+    try:
+        archived = run_retention(conn)
+    finally:
+        conn.close()
+    if archived:
+        print(f"📦 Archived {sum(archived.values())} old predictions")
+
 def background_sync():
-    """Run data sync every 60 minutes."""
+    """Run data sync every 60 minutes, score predictions whose target candle arrived, then apply retention."""
     while True:
         try:
-            run_sync()
+            for coin, timeframe in run_sync():
+                prediction_cache.invalidate(coin, timeframe)
+                history_cache.invalidate(coin, timeframe)
+            score_pending_predictions()
+            apply_retention()
         except Exception as e:
             print(f"❌ Background sync error: {e}")
         time.sleep(3600)
@@ -0,0 +1,143 @@
+"""
+ASGI serving mode for the prediction API.
+
+Serves the same handlers as app.py from one process under an event loop:
+
+    uvicorn --app-dir backened asgi:app --host 0.0.0.0 --port $PORT
+
+/predict, /api/auth/google, /api/user/stats and /health are async routes;
+their blocking work (candle reads, SQLite, inference) runs on a thread pool
+of ASGI_WORKERS threads, and once ASGI_MAX_PENDING calls are in flight new
+ones get a 503 instead of queueing without bound. Every other route is
+served by the Flask app mounted underneath. The model registry, caches and
+micro-batcher exist once per process, so concurrent requests share one
+TensorFlow runtime and one set of loaded models instead of a copy per sync
+worker.
+"""
+import asyncio
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import asynccontextmanager
+
+from a2wsgi import WSGIMiddleware
+from starlette.applications import Starlette
+from starlette.middleware import Middleware
+from starlette.middleware.cors import CORSMiddleware
+from starlette.middleware.gzip import GZipMiddleware
+from starlette.responses import PlainTextResponse, Response
+from starlette.routing import Mount, Route
+
+import app as flask_api
+from serialization import COMPRESS_LEVEL, COMPRESS_MIN_BYTES, dumps, loads
+
+ASGI_WORKERS = int(os.environ.get("ASGI_WORKERS", 8))
+ASGI_MAX_PENDING = int(os.environ.get("ASGI_MAX_PENDING", 256))
+# Run the hourly data sync in this process, as `python app.py` does
+BACKGROUND_SYNC = os.environ.get("BACKGROUND_SYNC", "1") == "1"
+
+
+class Overloaded(Exception):
+    pass
+
+
+class BoundedExecutor:
+    """Thread pool for blocking calls that rejects work beyond `max_pending` in-flight calls."""
+
+    def __init__(self, max_workers, max_pending):
+        self._pool = ThreadPoolExecutor(max_workers, thread_name_prefix="asgi-worker")
+        self._slots = threading.BoundedSemaphore(max_pending)
+
+    async def run(self, fn, *args):
+        if not self._slots.acquire(blocking=False):
+            raise Overloaded()
+        try:
+            return await asyncio.get_running_loop().run_in_executor(self._pool, fn, *args)
+        finally:
+            self._slots.release()
+
+    def shutdown(self):
+        self._pool.shutdown(wait=False)
+
+
+executor = BoundedExecutor(ASGI_WORKERS, ASGI_MAX_PENDING)
+
+
+def json_response(payload, status=200):
+    return Response(dumps(payload), status_code=status, media_type="application/json")
+
+
+async def call(fn, *args, label="Request"):
+    """Run a blocking app.py handler on the executor and turn its outcome into a response."""
+    try:
+        return json_response(await executor.run(fn, *args))
+    except Overloaded:
+        return json_response({"error": "Server busy, try again"}, 503)
+    except flask_api.PredictionError as e:
+        return json_response({"error": str(e)}, e.status)
+    except Exception as e:
+        print(f"❌ {label} Error: {e}")
+        return json_response({"error": str(e)}, 500)
+
+
+async def health(request):
+    return PlainTextResponse("ok")
+
+
+async def health_ready(request):
+    status = flask_api.registry.status()
+    return json_response(status, 200 if status["ready"] else 503)
+
+
+async def read_json(request):
+    try:
+        return loads(await request.body())
+    except ValueError:
+        return None
+
+
+async def google_auth(request):
+    data = await read_json(request)
+    if data is None:
+        return json_response({"error": "Invalid JSON body"}, 400)
+    return await call(flask_api.login_user, data, label="Login")
+
+
+async def user_stats(request):
+    return await call(flask_api.user_stats, request.path_params["user_id"], label="Stats")
+
+
+async def predict(request):
+    print("📥 Received prediction request")
+    data = await read_json(request)
+    if data is None:
+        return json_response({"error": "Invalid JSON body"}, 400)
+    return await call(flask_api.predict_one, data, label="Prediction")
+
+
+@asynccontextmanager
+async def lifespan(app):
+    if BACKGROUND_SYNC:
+        print("⏲️ Starting background sync thread...")
+        threading.Thread(target=flask_api.background_sync, daemon=True).start()
+    yield
+    flask_api.prediction_log.flush()
+    executor.shutdown()
+
+
+app = Starlette(
+    routes=[
+        Route("/health", health),
+        Route("/health/ready", health_ready),
+        Route("/predict", predict, methods=["POST"]),
+        Route("/api/auth/google", google_auth, methods=["POST"]),
+        Route("/api/user/stats/{user_id}", user_stats),
+        # /predict/batch, /history, /api/backtest, ... through the Flask app
+        Mount("/", WSGIMiddleware(flask_api.app)),
+    ],
+    middleware=[
+        Middleware(CORSMiddleware, allow_origins=["*"], allow_methods=["*"], allow_headers=["*"]),
+        Middleware(GZipMiddleware, minimum_size=COMPRESS_MIN_BYTES, compresslevel=COMPRESS_LEVEL),
+    ],
+    lifespan=lifespan,
+)
@@ -0,0 +1,195 @@
+"""
+Walk-forward backtests of the served models, and scoring of stored predictions.
+
+A backtest replays the last BACKTEST_WINDOWS candles through a model: every
+window only sees candles up to its own last one, and all windows go through
+one batched forward pass. Results are cached per (coin, timeframe) until a
+newer candle arrives.
+
+score_predictions() fills predictions.is_correct / actual_price once the
+candle a prediction targeted exists; a prediction is correct when it called
+the direction of the move from current_price.
+
+Usage:
+    python backened/backtest.py score      # score every pending prediction row
+"""
+import os
+import sys
+import threading
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+from data_sync import HOURLY_PATH, DAILY_PATH, FILE_MAP, candle_store
+from evaluation import horizon_metrics
+from price_store import CLOSE
+from windowing import make_windows
+
+BACKTEST_WINDOWS = int(os.environ.get("BACKTEST_WINDOWS", 2000))
+# Candle length per timeframe, used to bound the history read for scoring
+INTERVAL_SECONDS = {"hourly": 3600, "daily": 86400}
+
+
+def load_history(coin, timeframe, start_ts=None):
+    """(timestamps, closes) from start_ts on, from the binary store when imported; None if missing."""
+    name = FILE_MAP.get(coin, coin.lower() + "_inr")
+    series = candle_store.series(timeframe, name)
+    if series.exists():
+        timestamps, ohlcv = series.range(start_ts)
+        return np.asarray(timestamps), np.asarray(ohlcv[:, CLOSE])
+
+    folder = HOURLY_PATH if timeframe == "hourly" else DAILY_PATH
+    file_path = os.path.join(folder, f"{name}_{timeframe}.csv")
+    if not os.path.exists(file_path):
+        return None
+    df = pd.read_csv(file_path, usecols=["TIMESTAMP", "CLOSE"])
+    if start_ts is not None:
+        df = df[df["TIMESTAMP"] >= start_ts]
+    return df["TIMESTAMP"].to_numpy(dtype=np.int64), df["CLOSE"].to_numpy(dtype=np.float64)
+
+
+def scale_windows(X, scaler=None):
+    """
+    Scale (n, window, 1) windows exactly as /predict does.
+
+    With a training scaler every window shares its parameters; without one
+    each window is min-max fitted on itself. Returns (X_scaled, scale, min)
+    with scale/min broadcastable against (n, 1) predictions.
+    """
+    if scaler is not None:
+        return X * scaler.scale + scaler.min, scaler.scale, scaler.min
+
+    data_min = X.min(axis=1)
+    data_range = X.max(axis=1) - data_min
+    data_range[data_range == 0.0] = 1.0
+    scale = 1.0 / data_range
+    min_ = -data_min * scale
+    return X * scale[:, None, :] + min_[:, None, :], scale, min_
+
+
+def walk_forward(model, scaler, timestamps, closes, window, max_windows=BACKTEST_WINDOWS):
+    """Next-candle backtest over the last `max_windows` windows in one forward pass."""
+    closes = np.asarray(closes, dtype=np.float64)
+    start = max(0, len(closes) - window - max_windows)
+    X, y = make_windows(closes[start:], window, 1)
+    if not len(X):
+        return None
+
+    X_scaled, scale, min_ = scale_windows(X, scaler)
+    predicted_scaled = model.predict(np.asarray(X_scaled, dtype=np.float32))[:, :1]
+    predicted = ((predicted_scaled - min_) / scale)[:, 0]
+
+    last, actual = X[:, -1, 0], y[:, 0]
+    hits = np.sign(predicted - last) == np.sign(actual - last)
+    scores = horizon_metrics(actual, predicted)
+    return {
+        "windows": int(len(X)),
+        "directionalAccuracy": float(hits.mean() * 100.0),
+        "rmse": float(scores["RMSE"][0]),
+        "mae": float(scores["MAE"][0]),
+        "mape": float(scores["MAPE"][0]),
+        "fromTimestamp": int(timestamps[start + window]),
+        "toTimestamp": int(timestamps[-1]),
+    }
+
+
+class BacktestCache:
+    """Backtest results per (coin, timeframe), recomputed when the last candle changes."""
+
+    def __init__(self):
+        self._results = {}
+        self._lock = threading.Lock()
+
+    def get(self, key, last_ts, compute):
+        with self._lock:
+            cached = self._results.get(key)
+        if cached and cached[0] == last_ts:
+            return cached[1]
+        result = compute()
+        with self._lock:
+            self._results[key] = (last_ts, result)
+        return result
+
+    def invalidate(self, key=None):
+        with self._lock:
+            if key is None:
+                self._results.clear()
+            else:
+                self._results.pop(key, None)
+
+
+def base_time(row):
+    return row["candle_ts"] if row["candle_ts"] is not None else datetime.fromisoformat(row["timestamp"]).timestamp()
+
+
+def score_rows(rows, timestamps, closes):
+    """
+    (is_correct, actual_price, id) for rows whose target candle exists.
+
+    The base candle is candle_ts when recorded, else the last candle at or
+    before the prediction time; the target is `horizon` candles after it.
+    """
+    if not rows or not len(timestamps):
+        return []
+
+    ids = np.array([r["id"] for r in rows])
+    current = np.array([r["current_price"] for r in rows], dtype=np.float64)
+    predicted = np.array([r["predicted_price"] for r in rows], dtype=np.float64)
+    horizon = np.array([r["horizon"] or 1 for r in rows], dtype=np.int64)
+    made_at = np.array([datetime.fromisoformat(r["timestamp"]).timestamp() for r in rows])
+    candle_ts = np.array([r["candle_ts"] if r["candle_ts"] is not None else -1 for r in rows], dtype=np.int64)
+
+    # Last candle at or before the base time
+    base_ts = np.where(candle_ts >= 0, candle_ts, made_at)
+    base = np.searchsorted(timestamps, base_ts, side="right") - 1
+
+    target = base + horizon
+    ready = (base >= 0) & (target < len(timestamps))
+    actual = closes[target[ready]]
+    correct = np.sign(predicted[ready] - current[ready]) == np.sign(actual - current[ready])
+    return list(zip(correct.astype(int).tolist(), actual.tolist(), ids[ready].tolist()))
+
+
+def score_predictions(conn):
+    """Score every prediction whose target candle has arrived; returns how many rows were scored."""
+    rows = conn.execute(
+        "SELECT id, coin, timeframe, current_price, predicted_price, timestamp, candle_ts, horizon "
+        "FROM predictions WHERE is_correct IS NULL"
+    ).fetchall()
+
+    groups = {}
+    for row in rows:
+        if row["timeframe"] in INTERVAL_SECONDS:
+            groups.setdefault((row["coin"], row["timeframe"]), []).append(row)
+
+    updates = []
+    for (coin, timeframe), group in groups.items():
+        # Only candles from the oldest pending base candle on matter
+        start_ts = int(min(base_time(r) for r in group)) - INTERVAL_SECONDS[timeframe]
+        history = load_history(coin, timeframe, start_ts)
+        if history is None:
+            continue
+        updates.extend(score_rows(group, *history))
+
+    if updates:
+        conn.executemany("UPDATE predictions SET is_correct = ?, actual_price = ? WHERE id = ?", updates)
+        conn.commit()
+    return len(updates)
+
+
+def main():
+    if len(sys.argv) >= 2 and sys.argv[1] == "score":
+        from database import get_db_connection, init_db
+
+        init_db()
+        conn = get_db_connection()
+        scored = score_predictions(conn)
+        conn.close()
+        print(f"✅ Scored {scored} predictions")
+    else:
+        print(__doc__)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+import queue
+import threading
+import time
+from concurrent.futures import Future
+
+import numpy as np
+
+
+class MicroBatcher:
+    """
+    Coalesces concurrent single-window predictions into one forward pass.
+
+    Requests for the same model are queued; a worker per model waits up to
+    `max_wait_ms` after the first request for others to arrive, runs them as
+    one batch of at most `max_batch_size`, and hands each caller its row.
+
+    A request with no other request for its model in flight (always the case
+    in a sync worker) skips the queue and the wait, and the worker stops
+    waiting as soon as every request headed for the queue is in its batch;
+    requests on the direct path never join a batch, so they don't count.
+    """
+
+    def __init__(self, max_batch_size=32, max_wait_ms=5):
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000.0
+        self._queues = {}
+        self._in_flight = {}
+        self._queued = {}
+        self._lock = threading.Lock()
+
+    def predict(self, key, model, X):
+        """Same contract as `model.predict(X)` for a batch of one window."""
+        if self.max_batch_size <= 1 or self.max_wait <= 0:
+            return model.predict(X)
+
+        with self._lock:
+            self._in_flight[key] = self._in_flight.get(key, 0) + 1
+            alone = self._in_flight[key] == 1
+            if not alone:
+                self._queued[key] = self._queued.get(key, 0) + 1
+        try:
+            if alone:
+                return model.predict(X)
+            future = Future()
+            self._queue_for(key, model).put((X, future))
+            return future.result()
+        finally:
+            with self._lock:
+                self._in_flight[key] -= 1
+                if not alone:
+                    self._queued[key] -= 1
+
+    def _others_in_flight(self, key, batch):
+        """True while a queued request that isn't in `batch` yet is on its way."""
+        with self._lock:
+            return self._queued.get(key, 0) > len(batch)
+
+    def _queue_for(self, key, model):
+        with self._lock:
+            q = self._queues.get(key)
+            if q is None:
+                q = self._queues[key] = queue.Queue()
+                threading.Thread(target=self._worker, args=(key, q, model), name=f"batcher-{key}", daemon=True).start()
+            return q
+
+    def _worker(self, key, q, model):
+        while True:
+            batch = [q.get()]
+            deadline = time.perf_counter() + self.max_wait
+            while len(batch) < self.max_batch_size:
+                try:
+                    batch.append(q.get_nowait())
+                    continue
+                except queue.Empty:
+                    pass
+                remaining = deadline - time.perf_counter()
+                # Nobody else is coming: don't sit out the rest of the window
+                if remaining <= 0 or not self._others_in_flight(key, batch):
+                    break
+                try:
+                    batch.append(q.get(timeout=remaining))
+                except queue.Empty:
+                    break
+
+            windows = [X for X, _ in batch]
+            try:
+                predictions = model.predict(np.concatenate(windows))
+            except Exception as e:
+                for _, future in batch:
+                    future.set_exception(e)
+                continue
+
+            start = 0
+            for X, future in batch:
+                future.set_result(predictions[start:start + len(X)])
+                start += len(X)
@@ -0,0 +1,94 @@
+"""
+Micro-benchmark: per-record Python loop vs records_to_frame() on a catch-up page.
+
+Usage: python backened/bench_candles.py [--records 2000] [--repeat 20]
+"""
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+
+from candles import records_to_frame
+
+USD_TO_INR = 88.19
+DATE_FORMAT = '%d-%m-%Y %H.%M'
+
+
+def convert_loop(records, instrument, last_ts):
+    """The conversion sync_coin_data used to do row by row."""
+    rows = []
+    for rec in records:
+        ts = int(rec['TIMESTAMP'])
+        if ts > last_ts:
+            open_inr = float(rec['OPEN']) * USD_TO_INR
+            high_inr = float(rec['HIGH']) * USD_TO_INR
+            low_inr = float(rec['LOW']) * USD_TO_INR
+            close_inr = float(rec['CLOSE']) * USD_TO_INR
+            if open_inr < 1 or high_inr < 1 or low_inr < 1 or close_inr < 1:
+                continue
+            rows.append({
+                "UNIT": "HOUR",
+                "TIMESTAMP": ts,
+                "TYPE": rec.get('TYPE', '267'),
+                "MARKET": rec.get('MARKET', 'cadli'),
+                "INSTRUMENT": instrument,
+                "OPEN": open_inr,
+                "HIGH": high_inr,
+                "LOW": low_inr,
+                "CLOSE": close_inr,
+                "DATE": pd.to_datetime(ts, unit='s').strftime(DATE_FORMAT)
+            })
+    rows.sort(key=lambda x: x['TIMESTAMP'])
+    unique = {e['TIMESTAMP']: e for e in rows}
+    return pd.DataFrame(sorted(unique.values(), key=lambda x: x['TIMESTAMP']))
+
+
+def convert_vectorized(records, instrument, last_ts):
+    return records_to_frame(records, USD_TO_INR, unit="HOUR", instrument=instrument,
+                            after_ts=last_ts, min_price=1, date_format=DATE_FORMAT)
+
+
+def make_records(n):
+    rng = np.random.default_rng(0)
+    start = 1_700_000_000
+    close = np.abs(100 + np.cumsum(rng.normal(0, 1, n))) / 50  # some rows dip below 1 INR
+    return [
+        {"TIMESTAMP": start + i * 3600, "OPEN": c, "HIGH": c * 1.01, "LOW": c * 0.99, "CLOSE": c,
+         "TYPE": "267", "MARKET": "cadli"}
+        for i, c in enumerate(close)
+    ]
+
+
+def best_of(fn, repeat):
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - started) * 1000)
+    return min(samples)
+
+
+def main():
+    p = argparse.ArgumentParser()
+    p.add_argument("--records", type=int, default=2000)
+    p.add_argument("--repeat", type=int, default=20)
+    args = p.parse_args()
+
+    records = make_records(args.records)
+    last_ts = records[len(records) // 10]["TIMESTAMP"]
+
+    expected = convert_loop(records, "BTC-USD", last_ts)
+    actual = convert_vectorized(records, "BTC-USD", last_ts)
+    pd.testing.assert_frame_equal(expected, actual, check_dtype=False)
+
+    loop_ms = best_of(lambda: convert_loop(records, "BTC-USD", last_ts), args.repeat)
+    vec_ms = best_of(lambda: convert_vectorized(records, "BTC-USD", last_ts), args.repeat)
+    print(f"{args.records} records -> {len(actual)} rows")
+    print(f"  python loop       {loop_ms:.2f}ms")
+    print(f"  records_to_frame  {vec_ms:.2f}ms")
+    print(f"  speedup           {loop_ms / vec_ms:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,53 @@
+"""
+Per-call latency of model.predict() vs the compiled inference path.
+
+Usage: python backened/bench_inference.py [--timeframe hourly] [--model BITCOIN_INR] [--calls 200]
+Runs on CPU only so numbers match the Render instances.
+"""
+import argparse
+import os
+import time
+
+os.environ.setdefault("CUDA_VISIBLE_DEVICES", "-1")
+
+import keras
+import numpy as np
+
+from inference import CompiledModel
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+MODEL_PATH = os.path.join(BASE_DIR, "milestone-2", "infosys", "outputs", "models")
+
+
+def time_calls(fn, X, calls):
+    fn(X)  # warm up
+    samples = []
+    for _ in range(calls):
+        started = time.perf_counter()
+        fn(X)
+        samples.append((time.perf_counter() - started) * 1000)
+    return np.percentile(samples, 50), np.percentile(samples, 95)
+
+
+def main():
+    p = argparse.ArgumentParser()
+    p.add_argument("--timeframe", default="hourly")
+    p.add_argument("--model", default="BITCOIN_INR")
+    p.add_argument("--calls", type=int, default=200)
+    args = p.parse_args()
+
+    model = keras.models.load_model(os.path.join(MODEL_PATH, args.timeframe, f"{args.model}.keras"))
+    compiled = CompiledModel(model)
+    X = np.random.rand(1, *compiled.input_shape).astype(np.float32)
+
+    before = time_calls(lambda x: model.predict(x, verbose=0), X, args.calls)
+    after = time_calls(compiled.predict, X, args.calls)
+
+    print(f"{args.model} ({args.timeframe}), {args.calls} calls, batch of 1")
+    print(f"  model.predict   p50={before[0]:.2f}ms  p95={before[1]:.2f}ms")
+    print(f"  CompiledModel   p50={after[0]:.2f}ms  p95={after[1]:.2f}ms")
+    print(f"  speedup         {before[0] / after[0]:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,154 @@
+"""
+Benchmark: predictions insert/query latency and hot database size, before
+and after retention.run_retention(), on a synthetic table.
+
+Rows are spread evenly over the last --days days, ~30% of them anonymous.
+The defaults build 10M rows, which takes a few minutes and a few GB of disk;
+use --rows 1000000 for a quick run.
+
+Usage: python backened/bench_retention.py [--rows 10000000] [--days 365] [--users 1000]
+"""
+import argparse
+import os
+import shutil
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+import numpy as np
+
+import database
+from retention import run_retention
+
+INSERT_SQL = (
+    "INSERT INTO predictions (user_id, coin, timeframe, current_price, predicted_price, confidence, "
+    "timestamp, is_correct, candle_ts, horizon, actual_price) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)"
+)
+COINS = ["BTC", "ETH", "SOL", "BNB", "XRP", "ADA", "DOGE", "DOT", "LTC", "LINK"]
+CHUNK = 200_000
+
+
+def make_rows(start, count, total, now, days, users, rng, scored=True):
+    span = days * 86400
+    offsets = (np.arange(start, start + count) / max(total, 1)) * span
+    anonymous = rng.random(count) < 0.3
+    user_ids = rng.integers(0, users, count)
+    coins = rng.integers(0, len(COINS), count)
+    correct = rng.integers(0, 2, count)
+    base = now - timedelta(seconds=span)
+    rows = []
+    for i in range(count):
+        made = base + timedelta(seconds=float(offsets[i]))
+        rows.append((
+            "anonymous" if anonymous[i] else f"user{user_ids[i]}",
+            COINS[coins[i]], "hourly", 100.0, 101.0, 70, made.isoformat(),
+            int(correct[i]) if scored else None, int(made.timestamp()), 1,
+            99.5 if scored else None,
+        ))
+    return rows
+
+
+def fill(conn, rows, days, users):
+    rng = np.random.default_rng(0)
+    now = datetime.now()
+    started = time.perf_counter()
+    for start in range(0, rows, CHUNK):
+        count = min(CHUNK, rows - start)
+        with conn:
+            conn.executemany(INSERT_SQL, make_rows(start, count, rows, now, days, users, rng))
+        print(f"   {start + count:>11,} rows  {time.perf_counter() - started:6.1f}s", end="\r")
+    print()
+
+
+def percentiles(samples):
+    ms = np.array(samples) * 1000
+    return f"p50 {np.percentile(ms, 50):7.3f} ms   p99 {np.percentile(ms, 99):7.3f} ms"
+
+
+def measure(conn, users, repeat):
+    rng = np.random.default_rng(1)
+    now = datetime.now()
+
+    single = []
+    for row in make_rows(0, repeat, repeat, now, 0, users, rng, scored=False):
+        t0 = time.perf_counter()
+        with conn:
+            conn.execute(INSERT_SQL, row)
+        single.append(time.perf_counter() - t0)
+
+    batch = make_rows(0, 500, 500, now, 0, users, rng, scored=False)
+    t0 = time.perf_counter()
+    with conn:
+        conn.executemany(INSERT_SQL, batch)
+    batched = (time.perf_counter() - t0) / len(batch)
+
+    stats, history, unscored = [], [], []
+    for i in rng.integers(0, users, repeat):
+        user_id = f"user{i}"
+        t0 = time.perf_counter()
+        conn.execute("SELECT total, scored, correct FROM user_stats WHERE user_id = ?", (user_id,)).fetchone()
+        conn.execute(
+            "SELECT p.* FROM user_recent_predictions r JOIN predictions p ON p.id = r.prediction_id "
+            "WHERE r.user_id = ? ORDER BY p.timestamp DESC, p.id DESC", (user_id,)
+        ).fetchall()
+        stats.append(time.perf_counter() - t0)
+
+        t0 = time.perf_counter()
+        conn.execute(
+            "SELECT * FROM predictions WHERE user_id = ? ORDER BY timestamp DESC LIMIT 50", (user_id,)
+        ).fetchall()
+        history.append(time.perf_counter() - t0)
+
+    for coin in COINS:
+        t0 = time.perf_counter()
+        conn.execute(
+            "SELECT id FROM predictions WHERE coin = ? AND timeframe = 'hourly' AND is_correct IS NULL", (coin,)
+        ).fetchall()
+        unscored.append(time.perf_counter() - t0)
+
+    print(f"   insert, commit per row    {percentiles(single)}")
+    print(f"   insert, 500-row batch     {batched * 1e6:7.1f} µs/row")
+    print(f"   /api/user/stats queries   {percentiles(stats)}")
+    print(f"   last 50 rows of a user    {percentiles(history)}")
+    print(f"   unscored rows of a coin   {percentiles(unscored)}")
+
+
+def report_size(conn, label):
+    page_size = conn.execute("PRAGMA page_size").fetchone()[0]
+    pages = conn.execute("PRAGMA page_count").fetchone()[0]
+    free = conn.execute("PRAGMA freelist_count").fetchone()[0]
+    rows = conn.execute("SELECT COUNT(*) FROM predictions").fetchone()[0]
+    print(f"📊 {label}: {rows:,} hot rows, {pages * page_size / 1e6:,.1f} MB ({free} free pages)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=10_000_000)
+    parser.add_argument("--days", type=int, default=365)
+    parser.add_argument("--users", type=int, default=1000)
+    parser.add_argument("--repeat", type=int, default=500)
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix="bench_retention_")
+    try:
+        database.DB_PATH = os.path.join(workdir, "predictions.db")
+        database.init_db()
+        conn = database.get_db_connection()
+
+        print(f"🏗️ Building {args.rows:,} predictions over {args.days} days...")
+        fill(conn, args.rows, args.days, args.users)
+        report_size(conn, "Before retention")
+        measure(conn, args.users, args.repeat)
+
+        t0 = time.perf_counter()
+        archived = run_retention(conn, archive_dir=os.path.join(workdir, "archive"))
+        print(f"📦 Retention archived {sum(archived.values()):,} rows into {len(archived)} monthly files "
+              f"in {time.perf_counter() - t0:.1f}s")
+        report_size(conn, "After retention")
+        measure(conn, args.users, args.repeat)
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
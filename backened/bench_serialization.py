@@ -0,0 +1,102 @@
+"""
+Benchmark: stdlib json (what jsonify used to do, arrays converted with
+tolist()) vs serialization.dumps() (orjson with native NumPy arrays when
+installed), and bytes on the wire with and without gzip, for representative
+/predict, /predict/batch, /api/user/stats and /history payloads.
+
+Usage: python backened/bench_serialization.py [--repeat 2000]
+"""
+import argparse
+import gzip
+import json
+import time
+from datetime import datetime
+
+import numpy as np
+
+from serialization import COMPRESS_LEVEL, dumps, orjson
+
+
+def prediction(rng, horizon=1):
+    closes = 9_000_000 * np.exp(np.cumsum(rng.normal(0, 0.01, 60)))
+    result = {
+        "success": True, "coin": "BTC", "timeframe": "hourly",
+        "currentPrice": float(closes[-1]), "predictedPrice": float(closes[-1] * 1.01),
+        "historicalData": closes, "candleTimestamp": 1_760_000_000, "confidence": 85,
+        "timestamp": datetime.now().isoformat(), "status": "Live Data Connected", "version": "2.1",
+    }
+    if horizon > 1:
+        result["horizon"] = horizon
+        result["predictedPath"] = closes[-1] * np.exp(np.cumsum(rng.normal(0, 0.01, horizon)))
+    return result
+
+
+def user_stats(rng):
+    history = [
+        {"id": i, "user_id": "user1", "coin": "BTC", "timeframe": "hourly", "current_price": 9e6,
+         "predicted_price": float(9e6 * (1 + rng.normal(0, 0.01))), "confidence": 85,
+         "timestamp": datetime.now().isoformat(), "is_correct": 1, "candle_ts": 1_760_000_000,
+         "horizon": 1, "actual_price": 9.1e6}
+        for i in range(10)
+    ]
+    return {"success": True, "totalPredictions": 1234, "accuracyRate": 54.5, "scoredPredictions": 1200,
+            "history": history}
+
+
+def history(rng, points):
+    return {
+        "success": True, "coin": "BTC", "timeframe": "hourly", "candles": 50_000, "points": points,
+        "timestamps": 1_700_000_000 + np.arange(points, dtype=np.int64) * 3600,
+        "prices": 9_000_000 * np.exp(np.cumsum(rng.normal(0, 0.01, points))),
+    }
+
+
+def stdlib_dumps(obj):
+    """jsonify before: lists built with tolist(), compact stdlib encoder."""
+    def convert(value):
+        if isinstance(value, np.ndarray):
+            return value.tolist()
+        if isinstance(value, dict):
+            return {k: convert(v) for k, v in value.items()}
+        if isinstance(value, list):
+            return [convert(v) for v in value]
+        return value
+    return json.dumps(convert(obj), separators=(",", ":")).encode()
+
+
+def timed(fn, obj, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        fn(obj)
+    return (time.perf_counter() - start) / repeat * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--repeat", type=int, default=2000)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    payloads = {
+        "/predict": prediction(rng),
+        "/predict horizon=30": prediction(rng, 30),
+        "/predict/batch x10": {"success": True, "predictions": [prediction(rng) for _ in range(10)]},
+        "/api/user/stats": user_stats(rng),
+        "/history 1000 pts": history(rng, 1000),
+        "/history 5000 pts": history(rng, 5000),
+    }
+
+    print(f"Serializer: {'orjson' if orjson else 'stdlib json (orjson not installed)'}, gzip level {COMPRESS_LEVEL}")
+    print(f"{'payload':<22}{'stdlib µs':>11}{'fast µs':>10}{'speedup':>9}{'bytes':>9}{'gzip':>8}{'gzip µs':>9}")
+    for name, obj in payloads.items():
+        assert json.loads(dumps(obj)) == json.loads(stdlib_dumps(obj))
+        before = timed(stdlib_dumps, obj, args.repeat)
+        after = timed(dumps, obj, args.repeat)
+        body = dumps(obj)
+        compressed = gzip.compress(body, compresslevel=COMPRESS_LEVEL)
+        gzip_us = timed(lambda b: gzip.compress(b, compresslevel=COMPRESS_LEVEL), body, max(args.repeat // 10, 1))
+        print(f"{name:<22}{before:>11.1f}{after:>10.1f}{before / after:>8.1f}x{len(body):>9,}{len(compressed):>8,}{gzip_us:>9.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,58 @@
+import numpy as np
+import pandas as pd
+
+CANDLE_COLUMNS = ["UNIT", "TIMESTAMP", "TYPE", "MARKET", "INSTRUMENT", "OPEN", "HIGH", "LOW", "CLOSE", "DATE"]
+PRICE_COLUMNS = ["OPEN", "HIGH", "LOW", "CLOSE"]
+
+
+def _column(df, name, idx, default):
+    if name not in df.columns:
+        return default
+    column = df[name] if default is None else df[name].fillna(default)
+    return column.to_numpy()[idx]
+
+
+def records_to_frame(records, usd_to_inr, unit=None, instrument=None, after_ts=None, min_price=None, date_format=None):
+    """
+    Turn CoinDesk OHLC records into CSV-ready INR candles in one columnar pass.
+
+    Prices are converted with `usd_to_inr`; rows at or before `after_ts`, or
+    with any price below `min_price`, are dropped. Duplicate timestamps keep
+    the last record and the result is sorted by TIMESTAMP. DATE is formatted
+    with `date_format`, or left as datetimes when it is None. `unit` and
+    `instrument` override the values carried by the records.
+    """
+    df = pd.DataFrame.from_records(records)
+    if df.empty:
+        return pd.DataFrame(columns=CANDLE_COLUMNS)
+
+    ts = df["TIMESTAMP"].to_numpy(dtype=np.int64)
+    prices = df[PRICE_COLUMNS].to_numpy(dtype=np.float64) * usd_to_inr
+
+    keep = np.ones(len(df), dtype=bool)
+    if after_ts is not None:
+        keep &= ts > after_ts
+    if min_price is not None:
+        keep &= (prices >= min_price).all(axis=1)
+
+    # Stable sort, then keep the last record of each timestamp run
+    idx = np.flatnonzero(keep)
+    idx = idx[np.argsort(ts[idx], kind="stable")]
+    sorted_ts = ts[idx]
+    last_of_run = np.ones(len(idx), dtype=bool)
+    last_of_run[:-1] = sorted_ts[1:] != sorted_ts[:-1]
+    idx = idx[last_of_run]
+
+    out = pd.DataFrame({
+        "UNIT": unit if unit is not None else _column(df, "UNIT", idx, None),
+        "TIMESTAMP": ts[idx],
+        "TYPE": _column(df, "TYPE", idx, "267"),
+        "MARKET": _column(df, "MARKET", idx, "cadli"),
+        "INSTRUMENT": instrument if instrument is not None else _column(df, "INSTRUMENT", idx, None),
+    })
+    for i, col in enumerate(PRICE_COLUMNS):
+        out[col] = prices[idx, i]
+
+    dates = pd.to_datetime(ts[idx], unit="s")
+    out["DATE"] = dates.strftime(date_format) if date_format else dates
+    return out
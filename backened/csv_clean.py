@@ -0,0 +1,167 @@
+"""
+Chunked, incremental cleaning for the per-coin CSVs (milestone-2 filter.py).
+
+Rules are the ones filter.py always applied: DATE must parse (day first) and
+every OHLC + VOLUME value must be >= 1. Files are streamed in chunks, and a
+manifest next to the CSVs records each file's size, mtime and a sha1 of its
+whole contents after cleaning, so:
+
+    unchanged file           -> skipped (same size and mtime: not even read)
+    rows appended since      -> only the appended tail is cleaned
+    anything else            -> full streamed clean into a temp file + os.replace
+
+Hashing reads the bytes but doesn't parse them, which is far cheaper than a
+clean. Every rewrite goes through a temp file and os.replace, so a crash
+leaves either the old file or the new one.
+"""
+import hashlib
+import io
+import json
+import os
+
+import pandas as pd
+
+PRICE_COLUMNS = ["OPEN", "HIGH", "LOW", "CLOSE", "VOLUME"]
+MANIFEST_NAME = ".clean_manifest.json"
+HASH_BLOCK_BYTES = 1 << 20
+CHUNK_ROWS = 100_000
+
+
+def load_manifest(folder):
+    try:
+        with open(os.path.join(folder, MANIFEST_NAME)) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def save_manifest(folder, manifest):
+    path = os.path.join(folder, MANIFEST_NAME)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
+    os.replace(tmp_path, path)
+
+
+def _blocks(f, end):
+    """Blocks of an open binary file from its position up to byte `end`."""
+    remaining = end - f.tell()
+    while remaining > 0:
+        block = f.read(min(HASH_BLOCK_BYTES, remaining))
+        if not block:
+            return
+        remaining -= len(block)
+        yield block
+
+
+def fingerprint(file_path, end):
+    """sha1 of the file's first `end` bytes."""
+    digest = hashlib.sha1()
+    with open(file_path, "rb") as f:
+        for block in _blocks(f, end):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def clean_chunk(df, date_format, price_cols=PRICE_COLUMNS, skip_missing=False):
+    """
+    Apply the filter rules to one chunk; DATE is re-emitted with `date_format`.
+
+    A price column the chunk doesn't have raises ValueError, unless
+    `skip_missing` is set, in which case the rule only covers those present.
+    """
+    if "DATE" in df.columns:
+        # Already-cleaned rows parse with the output format; dayfirst inference
+        # would misread them as %Y-%d-%m and drop every day > 12
+        dates = pd.to_datetime(df["DATE"], format=date_format, errors="coerce")
+        raw = dates.isna()
+        if raw.any():
+            dates[raw] = pd.to_datetime(df.loc[raw, "DATE"], dayfirst=True, errors="coerce")
+        df = df[dates.notna()].copy()
+        df["DATE"] = dates[dates.notna()].dt.strftime(date_format)
+    missing = [col for col in price_cols if col not in df.columns]
+    if missing and not skip_missing:
+        raise ValueError(f"missing price columns {missing}; pass skip_missing=True to filter on the others")
+    cols = [col for col in price_cols if col in df.columns]
+    return df[(df[cols] >= 1).all(axis=1)]
+
+
+def _clean_full(file_path, date_format, chunksize, skip_missing):
+    """Stream the whole file into a temp file; swap it in only if a row changed."""
+    tmp_path = f"{file_path}.tmp"
+    rows, changed = 0, False
+    try:
+        with open(tmp_path, "w", newline="") as out:
+            for i, chunk in enumerate(pd.read_csv(file_path, chunksize=chunksize, dtype={"DATE": str})):
+                cleaned = clean_chunk(chunk, date_format, skip_missing=skip_missing)
+                changed = changed or len(cleaned) != len(chunk) or (
+                    "DATE" in chunk.columns and not cleaned["DATE"].equals(chunk["DATE"])
+                )
+                cleaned.to_csv(out, header=i == 0, index=False)
+                rows += len(cleaned)
+    except Exception:
+        os.remove(tmp_path)
+        raise
+
+    if changed:
+        os.replace(tmp_path, file_path)
+    else:
+        os.remove(tmp_path)
+    return rows, changed
+
+
+def _clean_tail(file_path, offset, date_format, skip_missing):
+    """Clean only the bytes appended after `offset`; the rows before it are copied as is."""
+    with open(file_path, "rb") as f:
+        header = f.readline()
+        f.seek(offset)
+        tail = f.read()
+
+    chunk = pd.read_csv(io.BytesIO(header + tail), dtype={"DATE": str})
+    cleaned = clean_chunk(chunk, date_format, skip_missing=skip_missing)
+    cleaned_bytes = cleaned.to_csv(header=False, index=False).encode()
+    changed = cleaned_bytes != tail
+    if changed:
+        tmp_path = f"{file_path}.tmp"
+        with open(file_path, "rb") as src, open(tmp_path, "wb") as out:
+            for block in _blocks(src, offset):
+                out.write(block)
+            out.write(cleaned_bytes)
+        os.replace(tmp_path, file_path)
+    return len(cleaned), changed
+
+
+def clean_file(file_path, manifest, date_format, chunksize=CHUNK_ROWS, skip_missing=False):
+    """
+    Clean one CSV in place, using `manifest` (updated here) to skip work.
+    `skip_missing` is passed on to clean_chunk.
+
+    Returns (status, rows) where status is "unchanged", "appended" or
+    "cleaned"; rows is None when the file was skipped without reading it.
+    """
+    key = os.path.basename(file_path)
+    entry = manifest.get(key)
+    stat = os.stat(file_path)
+
+    if entry and entry["size"] == stat.st_size and (
+        entry["mtime_ns"] == stat.st_mtime_ns or entry["hash"] == fingerprint(file_path, stat.st_size)
+    ):
+        entry["mtime_ns"] = stat.st_mtime_ns
+        return "unchanged", entry.get("rows")
+
+    if entry and stat.st_size > entry["size"] and entry["hash"] == fingerprint(file_path, entry["size"]):
+        added, _ = _clean_tail(file_path, entry["size"], date_format, skip_missing)
+        rows = entry["rows"] + added if entry.get("rows") is not None else None
+        status = "appended"
+    else:
+        rows, _ = _clean_full(file_path, date_format, chunksize, skip_missing)
+        status = "cleaned"
+
+    stat = os.stat(file_path)
+    manifest[key] = {
+        "size": stat.st_size,
+        "mtime_ns": stat.st_mtime_ns,
+        "hash": fingerprint(file_path, stat.st_size),
+        "rows": rows,
+    }
+    return status, rows
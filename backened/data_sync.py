@@ -1,17 +1,40 @@
 import os
+import json
+import threading
 import pandas as pd
 import requests
 import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
+from requests.adapters import HTTPAdapter
+from price_window import read_tail
+from price_store import PriceStore, frame_to_columns, import_csv
+from candles import records_to_frame
+from merged_dataset import append_frames, merged_watermarks, HOURLY_DATE_FORMAT, DAILY_DATE_FORMAT
 
 # Configuration
-COINDESK_API_BASE = "https://data-api.coindesk.com"
+# Overridable so the sync can run against a local stub server
+COINDESK_API_BASE = os.environ.get("COINDESK_API_BASE", "https://data-api.coindesk.com")
 USD_TO_INR = 88.19  # Constant for consistency with models
 
+SYNC_WORKERS = int(os.environ.get("SYNC_WORKERS", 4))
+SYNC_REQUESTS_PER_SECOND = float(os.environ.get("SYNC_REQUESTS_PER_SECOND", 4))  # shared by all workers
+SYNC_MAX_RETRIES = 3
+SYNC_BACKOFF_SECONDS = 1.0
+
 # Absolute paths to ensure it works from any directory
 BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 HOURLY_PATH = os.path.join(BASE_DIR, "milestone-1", "hourly")
 DAILY_PATH = os.path.join(BASE_DIR, "milestone-1", "daily")
+# Last synced timestamp, row count and byte offset per CSV
+SYNC_STATE_PATH = os.path.join(BASE_DIR, "milestone-1", "sync_state.json")
+# Rows read from the end of a CSV to find its newest candle without state
+LAST_TS_TAIL_ROWS = 100
+# Multi-coin datasets built by merge_*.py and kept current by run_sync
+MERGED_FILES = {
+    "hourly": (os.path.join(HOURLY_PATH, "all_crypto_inr_hourly_merged.csv"), HOURLY_DATE_FORMAT),
+    "daily": (os.path.join(DAILY_PATH, "all_crypto_inr_daily_merged.csv"), DAILY_DATE_FORMAT),
+}
 
 COINS = {
     "BTC": "BTC-USD",
@@ -40,12 +63,141 @@ FILE_MAP = {
     "BNB": "bnb_inr"
 }
 
+class RateLimiter:
+    """Spaces out calls from every thread so the API sees at most `rate` requests per second."""
+
+    def __init__(self, rate):
+        self.interval = 1.0 / rate if rate > 0 else 0.0
+        self._next_slot = 0.0
+        self._lock = threading.Lock()
+
+    def wait(self):
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next_slot)
+            self._next_slot = slot + self.interval
+        if slot > now:
+            time.sleep(slot - now)
+
+def create_session(pool_size=SYNC_WORKERS):
+    """Keep-alive session shared by all sync workers."""
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+def fetch_page(session, limiter, url, params, retries=None, backoff=None):
+    """
+    GET one page of records, retrying errors, 429s and 5xx with exponential backoff.
+
+    Returns [] when the API has no records and None when it gave up.
+    retries/backoff default to SYNC_MAX_RETRIES/SYNC_BACKOFF_SECONDS as set at call time.
+    """
+    retries = SYNC_MAX_RETRIES if retries is None else retries
+    backoff = SYNC_BACKOFF_SECONDS if backoff is None else backoff
+    for attempt in range(retries + 1):
+        limiter.wait()
+        try:
+            response = session.get(url, params=params, timeout=10)
+            if response.status_code == 200:
+                return response.json().get('Data', [])
+            if response.status_code != 429 and response.status_code < 500:
+                print(f"Error: Status {response.status_code} for {params.get('instrument')}")
+                return None
+            reason = f"status {response.status_code}"
+        except requests.RequestException as e:
+            reason = str(e)
+
+        if attempt < retries:
+            delay = backoff * (2 ** attempt)
+            print(f"  ...retrying {params.get('instrument')} in {delay:.1f}s ({reason})")
+            time.sleep(delay)
+    print(f"Giving up on {params.get('instrument')} after {retries + 1} attempts")
+    return None
+
+class SyncState:
+    """
+    Sidecar manifest of {csv name: {last_ts, rows, offset}} for incremental sync.
+    Merged datasets also keep `coins`, the newest TIMESTAMP of each coin.
+
+    An entry is trusted only while the CSV is still exactly `offset` bytes
+    long, so a file edited outside the sync falls back to a tail read (and a
+    one-off row count). Writes go to a temp file and are swapped in with os.replace.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+        self._entries = None
+
+    def _load(self):
+        if self._entries is None:
+            try:
+                with open(self.path) as f:
+                    self._entries = json.load(f)
+            except (OSError, ValueError):
+                self._entries = {}
+        return self._entries
+
+    @staticmethod
+    def _key(file_path):
+        return os.path.relpath(file_path, os.path.dirname(SYNC_STATE_PATH))
+
+    def get(self, file_path):
+        with self._lock:
+            entry = self._load().get(self._key(file_path))
+        # Entries written before row counts were tracked are rebuilt once
+        if entry and entry["rows"] is not None and entry["offset"] == os.path.getsize(file_path):
+            return entry
+        return None
+
+    def update(self, file_path, last_ts, rows, coins=None):
+        with self._lock:
+            entry = {
+                "last_ts": int(last_ts),
+                "rows": rows,
+                "offset": os.path.getsize(file_path),
+            }
+            if coins is not None:
+                entry["coins"] = coins
+            self._load()[self._key(file_path)] = entry
+            tmp_path = f"{self.path}.tmp"
+            with open(tmp_path, "w") as f:
+                json.dump(self._entries, f, indent=2, sort_keys=True)
+            os.replace(tmp_path, self.path)
+
+sync_state = SyncState(SYNC_STATE_PATH)
+candle_store = PriceStore()
+
+def count_rows(file_path, block_size=1 << 20):
+    """Data rows in a CSV with a header line, by counting newlines."""
+    lines, last = 0, b"\n"
+    with open(file_path, "rb") as f:
+        while block := f.read(block_size):
+            lines += block.count(b"\n")
+            last = block[-1:]
+    if last != b"\n":
+        lines += 1  # last row without a trailing newline
+    return max(lines - 1, 0)
+
 def get_last_timestamp(file_path):
     if not os.path.exists(file_path):
         return None
+    entry = sync_state.get(file_path)
+    if entry:
+        return entry["last_ts"]
     try:
-        df = pd.read_csv(file_path)
-        return int(df['TIMESTAMP'].max())
+        # Sorted files (either direction) have their max at one end; anything
+        # else is scanned in full, once, before the state entry exists
+        head = pd.read_csv(file_path, usecols=['TIMESTAMP'], nrows=1)['TIMESTAMP']
+        tail = read_tail(file_path, LAST_TS_TAIL_ROWS)['TIMESTAMP']
+        if tail.is_monotonic_increasing or tail.is_monotonic_decreasing:
+            last_ts = int(max(head.max(), tail.max()))
+        else:
+            last_ts = int(pd.read_csv(file_path, usecols=['TIMESTAMP'])['TIMESTAMP'].max())
+        sync_state.update(file_path, last_ts, rows=count_rows(file_path))
+        return last_ts
     except Exception as e:
         print(f"Error reading last timestamp from {file_path}: {e}")
         return None
@@ -66,7 +218,10 @@ def fetch_coindesk_data(endpoint, instrument, limit=2000):
         print(f"Error fetching {instrument} from Coindesk: {e}")
     return []
 
-def sync_coin_data(coin_name, instrument, interval_type):
+def sync_coin_data(coin_name, instrument, interval_type, session=None, limiter=None):
+    """Append new candles to the coin's CSV; returns the appended rows (None if skipped)."""
+    session = session or create_session(1)
+    limiter = limiter or RateLimiter(SYNC_REQUESTS_PER_SECOND)
     folder = HOURLY_PATH if interval_type == "hours" else DAILY_PATH
     filename = f"{FILE_MAP[coin_name]}_{'hourly' if interval_type == 'hours' else 'daily'}.csv"
     file_path = os.path.join(folder, filename)
@@ -74,13 +229,16 @@ def sync_coin_data(coin_name, instrument, interval_type):
     last_ts_file = get_last_timestamp(file_path)
     if not last_ts_file:
         print(f"Skipping {coin_name} {interval_type}: CSV not found or invalid.")
-        return
+        return None
+
+    known_state = sync_state.get(file_path)
 
     print(f"Syncing {coin_name} {interval_type} since {pd.to_datetime(last_ts_file, unit='s')}...")
     
-    all_new_to_append = []
+    fetched_records = []
     current_to_ts = int(time.time())
     chunk_size = 2000
+    complete = True
     
     # Fetch in batches until we hit last_ts
     while True:
@@ -94,77 +252,150 @@ def sync_coin_data(coin_name, instrument, interval_type):
         }
         
         try:
-            response = requests.get(url, params=params, timeout=10)
-            if response.status_code != 200:
-                print(f"Error: Status {response.status_code}")
+            records = fetch_page(session, limiter, url, params)
+            if records is None:
+                complete = False
                 break
-            
-            records = response.json().get('Data', [])
             if not records:
                 break
                 
-            batch_to_append = []
             min_batch_ts = records[0]['TIMESTAMP']
-            
-            # Filter and convert
-            for rec in records:
-                ts = int(rec['TIMESTAMP'])
-                if ts > last_ts_file:
-                    open_inr = float(rec['OPEN']) * USD_TO_INR
-                    high_inr = float(rec['HIGH']) * USD_TO_INR
-                    low_inr = float(rec['LOW']) * USD_TO_INR
-                    close_inr = float(rec['CLOSE']) * USD_TO_INR
-                    
-                    if open_inr < 1 or high_inr < 1 or low_inr < 1 or close_inr < 1:
-                        continue
-                        
-                    batch_to_append.append({
-                        "UNIT": "HOUR" if interval_type == "hours" else "DAY",
-                        "TIMESTAMP": ts,
-                        "TYPE": rec.get('TYPE', '267'),
-                        "MARKET": rec.get('MARKET', 'cadli'),
-                        "INSTRUMENT": instrument,
-                        "OPEN": open_inr,
-                        "HIGH": high_inr,
-                        "LOW": low_inr,
-                        "CLOSE": close_inr,
-                        "DATE": pd.to_datetime(ts, unit='s').strftime('%d-%m-%Y %H.%M' if interval_type == 'hours' else '%Y-%m-%d')
-                    })
-            
-            all_new_to_append.extend(batch_to_append)
+            fetched_records.extend(records)
             
             # If the earliest record in this batch is still after our goal, keep going back
             if min_batch_ts > last_ts_file and len(records) == chunk_size:
                 current_to_ts = min_batch_ts - 1
-                print(f"  ...fetched {len(batch_to_append)} records, going further back (current earlist: {pd.to_datetime(min_batch_ts, unit='s')})")
-                time.sleep(0.5) # Be kind to API
+                print(f"  ...fetched {len(records)} records, going further back (current earlist: {pd.to_datetime(min_batch_ts, unit='s')})")
             else:
                 break
                 
         except Exception as e:
             print(f"Exception during batch fetch: {e}")
+            complete = False
             break
 
-    if all_new_to_append:
-        # Sort by timestamp ascending before appending
-        all_new_to_append.sort(key=lambda x: x['TIMESTAMP'])
-        
-        # Remove duplicates if any (just in case)
-        unique_entries = {e['TIMESTAMP']: e for e in all_new_to_append}
-        sorted_unique = sorted(unique_entries.values(), key=lambda x: x['TIMESTAMP'])
-        
-        df_new = pd.DataFrame(sorted_unique)
+    # Newer pages without the older ones would leave a hole behind last_ts for good
+    if not complete:
+        if fetched_records:
+            print(f"⚠️ Not appending {len(fetched_records)} records for {coin_name} {interval_type}: an older page failed, retrying next sync")
+        return None
+
+    # Convert, filter (< 1 INR), de-duplicate and sort all pages in one pass
+    df_new = records_to_frame(
+        fetched_records,
+        USD_TO_INR,
+        unit="HOUR" if interval_type == "hours" else "DAY",
+        instrument=instrument,
+        after_ts=last_ts_file,
+        min_price=1,
+        date_format='%d-%m-%Y %H.%M' if interval_type == 'hours' else '%Y-%m-%d',
+    )
+
+    if len(df_new):
         df_new.to_csv(file_path, mode='a', header=False, index=False)
-        print(f"✅ Successfully appended {len(sorted_unique)} new records to {filename}")
+
+        sync_state.update(file_path, df_new['TIMESTAMP'].iloc[-1], known_state["rows"] + len(df_new))
+        print(f"✅ Successfully appended {len(df_new)} new records to {filename}")
     else:
         print(f"No newer data found for {coin_name} above {last_ts_file}")
 
+    # Keep the binary store in step once it has been imported. The CSV is the
+    # source of truth: a store that fell behind it (a failed append) catches
+    # up from its own last candle, so one failure doesn't leave a gap
+    series = candle_store.series('hourly' if interval_type == 'hours' else 'daily', FILE_MAP[coin_name])
+    if series.exists():
+        try:
+            store_ts = series.last_timestamp()
+            if store_ts is None or store_ts < last_ts_file:
+                import_csv(file_path, series)
+            elif len(df_new):
+                series.append(*frame_to_columns(df_new))
+        except Exception as e:
+            print(f"⚠️ Store update failed for {coin_name} {interval_type}, catching up next sync: {e}")
+    return df_new
+
+def sync_all(max_workers=SYNC_WORKERS, requests_per_second=SYNC_REQUESTS_PER_SECOND):
+    """
+    Sync every coin/interval on a thread pool sharing one keep-alive session
+    and one rate limiter. Returns a report row per job.
+    """
+    session = create_session(max_workers)
+    limiter = RateLimiter(requests_per_second)
+
+    def run_job(coin, instrument, interval_type):
+        started = time.perf_counter()
+        try:
+            frame = sync_coin_data(coin, instrument, interval_type, session, limiter)
+            error = None
+        except Exception as e:
+            frame, error = None, str(e)
+            print(f"❌ Sync failed for {coin} {interval_type}: {e}")
+        return {
+            "coin": coin,
+            "timeframe": "hourly" if interval_type == "hours" else "daily",
+            "appended": 0 if frame is None else len(frame),
+            "frame": frame,
+            "seconds": time.perf_counter() - started,
+            "error": error,
+        }
+
+    jobs = [(coin, instrument, interval_type) for coin, instrument in COINS.items() for interval_type in ("hours", "days")]
+    with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="sync") as executor:
+        report = list(executor.map(lambda job: run_job(*job), jobs))
+    session.close()
+    return report
+
+def update_merged_datasets(report):
+    """
+    Append this run's new candles to the merged multi-coin CSVs.
+
+    Each coin's rows newer than its own watermark (its last TIMESTAMP in
+    the merged file) are written, so a coin that lags behind the others
+    still gets its late rows in. Watermarks live in sync_state and are
+    rebuilt with one scan of the merged file when missing or stale.
+    """
+    for timeframe, (merged_path, date_format) in MERGED_FILES.items():
+        frames = {
+            FILE_MAP[row["coin"]]: row["frame"]
+            for row in report if row["timeframe"] == timeframe and row["appended"]
+        }
+        if not frames:
+            continue
+        if not os.path.exists(merged_path):
+            print(f"Skipping merged {timeframe} dataset: {merged_path} not found (run merge_{timeframe}.py once)")
+            continue
+
+        try:
+            entry = sync_state.get(merged_path) or {}
+            # Entries keyed on coin labels (before file stems) are rebuilt too
+            if "coins" in entry and set(entry["coins"]) <= set(FILE_MAP.values()):
+                watermarks, rows = entry["coins"], entry["rows"]
+            else:
+                watermarks, rows = merged_watermarks(merged_path, FILE_MAP.values()) or {}, count_rows(merged_path)
+            written, skipped, watermarks = append_frames(merged_path, frames, date_format, watermarks)
+        except Exception as e:
+            print(f"❌ Failed to update {os.path.basename(merged_path)}: {e}")
+            continue
+
+        if watermarks:
+            sync_state.update(merged_path, max(watermarks.values()), rows + written, coins=watermarks)
+        if skipped:
+            print(f"Skipped {skipped} rows already in {os.path.basename(merged_path)}")
+        print(f"✅ Appended {written} rows to {os.path.basename(merged_path)}")
+
 def run_sync():
+    """Sync every coin and return the (coin, timeframe) pairs that received new rows."""
     print(f"🚀 Starting Real-time Data Sync Engine at {datetime.now()}")
-    for coin, instrument in COINS.items():
-        sync_coin_data(coin, instrument, "hours")
-        sync_coin_data(coin, instrument, "days")
-    print(f"🏁 Sync completed at {datetime.now()}")
+    started = time.perf_counter()
+    report = sync_all()
+
+    print("⏱️ Sync report:")
+    for row in report:
+        status = row["error"] or f"+{row['appended']} rows"
+        print(f"  {row['coin']:<6}{row['timeframe']:<8}{row['seconds']:>7.2f}s  {status}")
+    update_merged_datasets(report)
+    print(f"🏁 Sync completed at {datetime.now()} ({time.perf_counter() - started:.2f}s wall)")
+    return [(row["coin"], row["timeframe"]) for row in report if row["appended"]]
 
 if __name__ == "__main__":
     run_sync()
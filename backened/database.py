@@ -1,13 +1,199 @@
 import sqlite3
 import os
+import atexit
+import queue
+import threading
+import time
 from datetime import datetime
 
 DB_PATH = os.path.join(os.path.dirname(__file__), "crypto_pro.db")
 
+# Applied to every new connection. WAL lets readers run alongside the writer;
+# synchronous=NORMAL only fsyncs at checkpoints, which WAL keeps crash-safe.
+# auto_vacuum only sticks on a new file (retention.py --vacuum converts existing ones)
+# and has to come before journal_mode.
+DB_BUSY_TIMEOUT_MS = int(os.environ.get("DB_BUSY_TIMEOUT_MS", 5000))
+PRAGMAS = (
+    "PRAGMA auto_vacuum=INCREMENTAL",
+    "PRAGMA journal_mode=WAL",
+    "PRAGMA synchronous=NORMAL",
+    f"PRAGMA busy_timeout={DB_BUSY_TIMEOUT_MS}",
+    "PRAGMA temp_store=MEMORY",
+    "PRAGMA cache_size=-8000",
+)
+
+# predictions columns added after the first release, migrated in place by init_db
+PREDICTION_MIGRATIONS = {
+    "candle_ts": "INTEGER",            # TIMESTAMP of the last candle the model saw
+    "horizon": "INTEGER DEFAULT 1",    # candles ahead predicted_price refers to
+    "actual_price": "REAL",            # close of the target candle, set when scored
+}
+
+# Size of the per-user ring of latest predictions shown on the profile page
+RECENT_PREDICTIONS = 10
+
+# Idle connections kept open for reuse; more can be checked out at once, but
+# anything past this many is closed when it's handed back
+DB_POOL_SIZE = int(os.environ.get("DB_POOL_SIZE", 8))
+
+class PooledConnection:
+    """
+    A sqlite3 connection borrowed from a ConnectionPool.
+
+    Behaves like the connection itself, but close() rolls back an unfinished
+    transaction and hands it back to the pool instead of disconnecting.
+    """
+
+    def __init__(self, pool):
+        self.pool = pool
+        self._conn = sqlite3.connect(pool.path, timeout=DB_BUSY_TIMEOUT_MS / 1000, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        for pragma in PRAGMAS:
+            self._conn.execute(pragma)
+        self._checked_out = True
+
+    def __getattr__(self, name):
+        return getattr(self._conn, name)
+
+    def __enter__(self):
+        return self._conn.__enter__()
+
+    def __exit__(self, *exc):
+        return self._conn.__exit__(*exc)
+
+    def close(self):
+        if not self._checked_out:
+            return
+        self._checked_out = False
+        if self._conn.in_transaction:
+            self._conn.rollback()
+        self.pool.release(self)
+
+class ConnectionPool:
+    """
+    Bounded pool of idle connections to one database file.
+
+    Connections aren't tied to threads, so the short-lived threads of the
+    threaded dev server and a2wsgi reuse them instead of each opening (and
+    never closing) their own. A connection that is never handed back is
+    closed when it's garbage collected.
+    """
+
+    def __init__(self, path, size):
+        self.path = path
+        self.pid = os.getpid()
+        self._idle = queue.LifoQueue(maxsize=size)
+
+    def acquire(self):
+        try:
+            conn = self._idle.get_nowait()
+        except queue.Empty:
+            return PooledConnection(self)
+        conn._checked_out = True
+        return conn
+
+    def release(self, conn):
+        try:
+            self._idle.put_nowait(conn)
+        except queue.Full:
+            conn._conn.close()
+
+_pool = None
+_pool_lock = threading.Lock()
+
 def get_db_connection():
-    conn = sqlite3.connect(DB_PATH)
-    conn.row_factory = sqlite3.Row
-    return conn
+    """A connection from the process's pool; close() returns it (a new pool after a fork)."""
+    global _pool
+    with _pool_lock:
+        if _pool is None or _pool.path != DB_PATH or _pool.pid != os.getpid():
+            _pool = ConnectionPool(DB_PATH, DB_POOL_SIZE)
+        pool = _pool
+    return pool.acquire()
+
+class WriteBehindQueue:
+    """
+    Buffers INSERT rows and writes them from a background thread.
+
+    Rows submitted within `max_delay` seconds of each other (up to
+    `max_batch`) are written with one executemany in a single transaction.
+    max_delay <= 0 writes synchronously instead. Pending rows are flushed at
+    interpreter exit; rows that can't be written are logged and counted in
+    `dropped`.
+    """
+
+    def __init__(self, sql, max_batch=500, max_delay=0.05):
+        self.sql = sql
+        self.max_batch = max_batch
+        self.max_delay = max_delay
+        self._queue = queue.Queue()
+        self._thread = None
+        self._lock = threading.Lock()
+        self.dropped = 0
+        atexit.register(self.flush)
+
+    def submit(self, rows):
+        if self.max_delay <= 0:
+            self._write(list(rows))
+            return
+        with self._lock:
+            # Threads don't survive a fork; start one in whichever process submits
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, daemon=True, name="db-writer")
+                self._thread.start()
+        self._queue.put(list(rows))
+
+    def flush(self, timeout=5.0):
+        """Block until everything submitted so far is written; False on timeout."""
+        if self._thread is None or not self._thread.is_alive():
+            return True
+        done = threading.Event()
+        self._queue.put(done)
+        return done.wait(timeout)
+
+    def _run(self):
+        while True:
+            batch, waiters = [], []
+            item = self._queue.get()
+            deadline = time.monotonic() + self.max_delay
+            while True:
+                if isinstance(item, threading.Event):
+                    waiters.append(item)
+                    break
+                batch.extend(item)
+                remaining = deadline - time.monotonic()
+                if len(batch) >= self.max_batch or remaining <= 0:
+                    break
+                try:
+                    item = self._queue.get(timeout=remaining)
+                except queue.Empty:
+                    break
+            try:
+                if batch:
+                    self._write(batch)
+            finally:
+                for waiter in waiters:
+                    waiter.set()
+
+    def _write(self, rows):
+        # Anything raised here would kill the writer thread, not just this batch
+        try:
+            conn = get_db_connection()
+            try:
+                with conn:
+                    conn.executemany(self.sql, rows)
+            finally:
+                conn.close()
+            return
+        except Exception as e:
+            error = e
+        if len(rows) == 1:
+            with self._lock:
+                self.dropped += 1
+            print(f"❌ Failed to write row: {error!r}")
+            return
+        # Retry one by one so a single bad row doesn't drop the whole batch
+        for row in rows:
+            self._write([row])
 
 def init_db():
     print("🗄️ Initializing Database...")
@@ -37,13 +223,170 @@ def init_db():
         confidence INTEGER,
         timestamp TEXT,
         is_correct INTEGER DEFAULT NULL,
+        candle_ts INTEGER,
+        horizon INTEGER DEFAULT 1,
+        actual_price REAL,
         FOREIGN KEY (user_id) REFERENCES users (id)
     )
     ''')
-    
+
+    existing = {row["name"] for row in cursor.execute("PRAGMA table_info(predictions)")}
+    for column, definition in PREDICTION_MIGRATIONS.items():
+        if column not in existing:
+            cursor.execute(f"ALTER TABLE predictions ADD COLUMN {column} {definition}")
+
+    # Rows still waiting for their target candle, read by the scoring job
+    cursor.execute('''
+    CREATE INDEX IF NOT EXISTS idx_predictions_unscored
+    ON predictions (coin, timeframe) WHERE is_correct IS NULL
+    ''')
+
+    # Per-user history in time order without a table scan
+    cursor.execute('''
+    CREATE INDEX IF NOT EXISTS idx_predictions_user_time
+    ON predictions (user_id, timestamp)
+    ''')
+
+    # Age scans for retention.py
+    cursor.execute('''
+    CREATE INDEX IF NOT EXISTS idx_predictions_time
+    ON predictions (timestamp)
+    ''')
+
+    # Daily rollups of rows retention.py moved to the archive files
+    cursor.execute('''
+    CREATE TABLE IF NOT EXISTS prediction_daily (
+        day TEXT NOT NULL,
+        coin TEXT NOT NULL,
+        timeframe TEXT NOT NULL,
+        user_id TEXT NOT NULL,
+        predictions INTEGER NOT NULL DEFAULT 0,
+        scored INTEGER NOT NULL DEFAULT 0,
+        correct INTEGER NOT NULL DEFAULT 0,
+        abs_pct_error REAL NOT NULL DEFAULT 0,
+        PRIMARY KEY (day, coin, timeframe, user_id)
+    )
+    ''')
+
+    init_user_stats(cursor)
+
     conn.commit()
     conn.close()
     print("✅ Database Initialized.")
 
+def init_user_stats(cursor):
+    """
+    Per-user summary kept current by triggers, so profile stats never scan predictions.
+
+    user_stats holds running totals; user_recent_predictions is a ring of the
+    last RECENT_PREDICTIONS prediction ids per user. A new id takes a free
+    slot (one left by a delete, or never used) and otherwise replaces the
+    oldest id in the ring. Both are updated in the same transaction as the
+    predictions write.
+    """
+    created = cursor.execute(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'user_stats'"
+    ).fetchone() is None
+
+    # The first insert trigger picked slot = total % N, which went wrong once
+    # deletes lowered total; replace it and rebuild the rings it left behind
+    old_trigger = cursor.execute(
+        "SELECT sql FROM sqlite_master WHERE type = 'trigger' AND name = 'trg_predictions_insert_stats'"
+    ).fetchone()
+    outdated = old_trigger is not None and "total - 1" in old_trigger[0]
+    if outdated:
+        cursor.execute("DROP TRIGGER trg_predictions_insert_stats")
+
+    cursor.execute('''
+    CREATE TABLE IF NOT EXISTS user_stats (
+        user_id TEXT PRIMARY KEY,
+        total INTEGER NOT NULL DEFAULT 0,
+        scored INTEGER NOT NULL DEFAULT 0,
+        correct INTEGER NOT NULL DEFAULT 0
+    )
+    ''')
+    cursor.execute('''
+    CREATE TABLE IF NOT EXISTS user_recent_predictions (
+        user_id TEXT NOT NULL,
+        slot INTEGER NOT NULL,
+        prediction_id INTEGER NOT NULL,
+        PRIMARY KEY (user_id, slot)
+    )
+    ''')
+    cursor.execute('''
+    CREATE INDEX IF NOT EXISTS idx_user_recent_prediction
+    ON user_recent_predictions (prediction_id)
+    ''')
+
+    slots = ", ".join(f"({slot})" for slot in range(RECENT_PREDICTIONS))
+    cursor.execute(f'''
+    CREATE TRIGGER IF NOT EXISTS trg_predictions_insert_stats
+    AFTER INSERT ON predictions WHEN NEW.user_id IS NOT NULL
+    BEGIN
+        INSERT INTO user_stats (user_id, total, scored, correct)
+        VALUES (NEW.user_id, 1, NEW.is_correct IS NOT NULL, COALESCE(NEW.is_correct, 0))
+        ON CONFLICT (user_id) DO UPDATE SET
+            total = total + 1,
+            scored = scored + excluded.scored,
+            correct = correct + excluded.correct;
+        INSERT OR REPLACE INTO user_recent_predictions (user_id, slot, prediction_id)
+        VALUES (
+            NEW.user_id,
+            CASE WHEN (SELECT COUNT(*) FROM user_recent_predictions WHERE user_id = NEW.user_id) < {RECENT_PREDICTIONS}
+            THEN (SELECT MIN(column1) FROM (VALUES {slots}) WHERE column1 NOT IN
+                    (SELECT slot FROM user_recent_predictions WHERE user_id = NEW.user_id))
+            ELSE (SELECT slot FROM user_recent_predictions WHERE user_id = NEW.user_id
+                  ORDER BY prediction_id LIMIT 1)
+            END,
+            NEW.id
+        );
+    END
+    ''')
+    cursor.execute('''
+    CREATE TRIGGER IF NOT EXISTS trg_predictions_score_stats
+    AFTER UPDATE OF is_correct ON predictions
+    WHEN NEW.user_id IS NOT NULL AND OLD.is_correct IS NOT NEW.is_correct
+    BEGIN
+        UPDATE user_stats SET
+            scored = scored + (NEW.is_correct IS NOT NULL) - (OLD.is_correct IS NOT NULL),
+            correct = correct + COALESCE(NEW.is_correct, 0) - COALESCE(OLD.is_correct, 0)
+        WHERE user_id = NEW.user_id;
+    END
+    ''')
+    cursor.execute('''
+    CREATE TRIGGER IF NOT EXISTS trg_predictions_delete_stats
+    AFTER DELETE ON predictions WHEN OLD.user_id IS NOT NULL
+    BEGIN
+        UPDATE user_stats SET
+            total = total - 1,
+            scored = scored - (OLD.is_correct IS NOT NULL),
+            correct = correct - COALESCE(OLD.is_correct, 0)
+        WHERE user_id = OLD.user_id;
+        DELETE FROM user_recent_predictions WHERE prediction_id = OLD.id;
+    END
+    ''')
+
+    if created or outdated:
+        rebuild_user_stats(cursor)
+
+def rebuild_user_stats(cursor):
+    """Recompute user_stats and the recent ring from predictions (first run or repair)."""
+    cursor.execute("DELETE FROM user_stats")
+    cursor.execute("DELETE FROM user_recent_predictions")
+    cursor.execute('''
+    INSERT INTO user_stats (user_id, total, scored, correct)
+    SELECT user_id, COUNT(*), COUNT(is_correct), COALESCE(SUM(is_correct), 0)
+    FROM predictions WHERE user_id IS NOT NULL GROUP BY user_id
+    ''')
+    cursor.execute(f'''
+    INSERT INTO user_recent_predictions (user_id, slot, prediction_id)
+    SELECT user_id, rn - 1, id
+    FROM (
+        SELECT id, user_id, ROW_NUMBER() OVER (PARTITION BY user_id ORDER BY id DESC) AS rn
+        FROM predictions WHERE user_id IS NOT NULL
+    )
+    WHERE rn <= {RECENT_PREDICTIONS}
+    ''')
+
 if __name__ == "__main__":
     init_db()
@@ -0,0 +1,55 @@
+"""
+Vectorized evaluation for multi-horizon forecasts.
+
+Predictions and targets are (windows, horizon) matrices. Inverse scaling is
+one affine transform over the whole matrix, and RMSE/MAE/MAPE are reduced
+along the window axis, so every horizon is scored in a single NumPy pass.
+"""
+import numpy as np
+
+from scaling import AffineScaler
+
+METRICS = ("RMSE", "MAE", "MAPE")
+
+
+def inverse_scale(values, scaler):
+    """Undo MinMax scaling on an array of any shape (single-feature scaler)."""
+    if not isinstance(scaler, AffineScaler):
+        scaler = AffineScaler.from_sklearn(scaler)
+    return scaler.inverse_transform(values)
+
+
+def horizon_metrics(y_true, y_pred):
+    """{"RMSE": [...], "MAE": [...], "MAPE": [...]} with one value per horizon column."""
+    y_true = np.asarray(y_true, dtype=np.float64)
+    y_pred = np.asarray(y_pred, dtype=np.float64)
+    if y_true.ndim == 1:
+        y_true, y_pred = y_true[:, None], y_pred.reshape(len(y_pred), -1)
+    if y_true.shape[0] == 0:
+        nan = np.full(y_true.shape[1], np.nan)
+        return {name: nan for name in METRICS}
+
+    err = y_true - y_pred
+    denom = np.clip(np.abs(y_true), 1e-8, None)
+    return {
+        "RMSE": np.sqrt(np.mean(err ** 2, axis=0)),
+        "MAE": np.mean(np.abs(err), axis=0),
+        "MAPE": np.mean(np.abs(err) / denom, axis=0) * 100.0,
+    }
+
+
+def metrics_row(y_true, y_pred, prefix=""):
+    """
+    Flat metrics for metrics.csv.
+
+    `<prefix>RMSE` etc. score the first step, as the notebook always did;
+    forecasts longer than one step add `<prefix>RMSE_h<k>` for every step k.
+    """
+    scores = horizon_metrics(y_true, y_pred)
+    row = {f"{prefix}{name}": float(scores[name][0]) for name in METRICS}
+    horizon = len(scores["RMSE"])
+    if horizon > 1:
+        for name in METRICS:
+            for k in range(horizon):
+                row[f"{prefix}{name}_h{k + 1}"] = float(scores[name][k])
+    return row
@@ -0,0 +1,114 @@
+"""
+Precomputed chart payloads for /history.
+
+A payload is built once per (coin, timeframe, candles, points) and version
+of the underlying candles, and kept as ready-to-send JSON bytes with a
+content-hash ETag. Compressed variants are made on first request and kept
+alongside, so serving a chart is a dict lookup (or a 304) rather than a
+fresh serialisation. Long ranges are downsampled with LTTB, which keeps the
+peaks and troughs a plain stride would drop.
+"""
+import gzip
+import hashlib
+import threading
+from collections import OrderedDict
+
+import numpy as np
+
+from serialization import dumps
+
+try:
+    import brotli
+except ImportError:  # optional: gzip only
+    brotli = None
+
+
+def lttb(x, y, threshold):
+    """
+    Largest-Triangle-Three-Buckets downsampling to `threshold` points.
+
+    Keeps the first and last point; from every bucket in between it keeps
+    the point forming the largest triangle with the previously kept point
+    and the average of the next bucket. Returns the kept indices.
+    """
+    n = len(x)
+    if threshold >= n or threshold < 3:
+        return np.arange(n)
+
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    edges = np.linspace(1, n - 1, threshold - 1).astype(np.int64)
+    kept = np.empty(threshold, dtype=np.int64)
+    kept[0], kept[-1] = 0, n - 1
+
+    a = 0
+    for i in range(threshold - 2):
+        lo, hi = edges[i], edges[i + 1]
+        # Average of the next bucket (the last point for the final bucket)
+        nlo, nhi = hi, edges[i + 2] if i + 2 < len(edges) else n
+        avg_x, avg_y = x[nlo:nhi].mean(), y[nlo:nhi].mean()
+
+        area = np.abs((x[a] - avg_x) * (y[lo:hi] - y[a]) - (x[a] - x[lo:hi]) * (avg_y - y[a]))
+        a = lo + int(np.argmax(area))
+        kept[i + 1] = a
+    return kept
+
+
+class HistoryPayload:
+    def __init__(self, version, data):
+        self.version = version
+        self.body = dumps(data)
+        self.etag = hashlib.sha1(self.body).hexdigest()[:20]
+        self._encoded = {}
+        self._lock = threading.Lock()
+
+    def encoded(self, encoding):
+        """Body compressed with `encoding` ("br", "gzip" or None), compressed once."""
+        if encoding is None:
+            return self.body
+        with self._lock:
+            if encoding not in self._encoded:
+                if encoding == "br":
+                    self._encoded[encoding] = brotli.compress(self.body)
+                else:
+                    self._encoded[encoding] = gzip.compress(self.body, compresslevel=9)
+            return self._encoded[encoding]
+
+
+def choose_encoding(accept_encodings):
+    """Best encoding the client accepts (werkzeug Accept-Encoding header), None for identity."""
+    if brotli is not None and accept_encodings.quality("br") > 0:
+        return "br"
+    if accept_encodings.quality("gzip") > 0:
+        return "gzip"
+    return None
+
+
+class HistoryCache:
+    """LRU of HistoryPayloads, rebuilt when the version of the candles behind them changes."""
+
+    def __init__(self, max_entries=64):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key, version, build):
+        with self._lock:
+            payload = self._entries.get(key)
+            if payload is not None and payload.version == version:
+                self._entries.move_to_end(key)
+                return payload
+
+        payload = HistoryPayload(version, build())
+        with self._lock:
+            self._entries[key] = payload
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return payload
+
+    def invalidate(self, coin=None, timeframe=None):
+        with self._lock:
+            for key in list(self._entries):
+                if (coin is None or key[0] == coin) and (timeframe is None or key[1] == timeframe):
+                    del self._entries[key]
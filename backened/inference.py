@@ -0,0 +1,95 @@
+import numpy as np
+import keras
+import tensorflow as tf
+
+
+# Longest path forecast() can roll out (in model calls); the XLA rollout
+# writes into a buffer of this many iterations so one compiled program
+# serves every horizon
+ROLLOUT_MAX_ITERATIONS = 64
+
+
+class CompiledModel:
+    """
+    Single-call inference wrapper around a Keras model.
+
+    `model.predict()` spins up a data adapter, callbacks and a progress bar
+    on every call, which for a (1, 60, 1) window costs more than the LSTM
+    itself. Here the forward pass is traced once into a `tf.function` with a
+    variable batch dimension and called directly.
+
+    `forecast()` produces multi-step paths: from the model's native output
+    when it was trained with a long enough horizon, otherwise by a sliding
+    window rollout, the same 60-step windows the model was trained on, run
+    as one XLA-compiled loop. XLA compiles once per batch size, so batches
+    are padded to a power of two; the first rollout of each size pays the
+    compile (~1.5s).
+    """
+
+    def __init__(self, model):
+        self.model = model
+        self.input_shape = tuple(model.input_shape[1:])
+        self.horizon = int(model.output_shape[-1])
+        input_spec = tf.TensorSpec((None,) + self.input_shape, tf.float32)
+        self._call = tf.function(lambda x: model(x, training=False), input_signature=[input_spec])
+        rollout_spec = [input_spec, tf.TensorSpec((), tf.int32)]
+        self._rollout = tf.function(self._rollout_graph, input_signature=rollout_spec, jit_compile=True)
+        self._rollout_spec = rollout_spec
+
+    def _rollout_graph(self, x, iterations):
+        # Each iteration predicts `horizon` steps and slides them into the
+        # window. Results go into a fixed-size buffer so the loop count can
+        # stay dynamic under XLA.
+        horizon = self.horizon
+        batch = tf.shape(x)[0]
+        preds = tf.zeros([ROLLOUT_MAX_ITERATIONS, batch, horizon])
+
+        def body(i, window, preds):
+            y = self.model(window, training=False)
+            preds = tf.tensor_scatter_nd_update(preds, [[i]], tf.expand_dims(y, 0))
+            window = tf.concat([window[:, horizon:, :], tf.expand_dims(y, -1)], axis=1)
+            return i + 1, window, preds
+
+        _, _, preds = tf.while_loop(lambda i, window, preds: i < iterations, body, [tf.constant(0), x, preds])
+        stacked = tf.transpose(preds, [1, 0, 2])  # (batch, iterations, horizon)
+        return tf.reshape(stacked, [batch, ROLLOUT_MAX_ITERATIONS * horizon])
+
+    def _run_rollout(self, X, iterations):
+        try:
+            return self._rollout(X, iterations)
+        except (tf.errors.InvalidArgumentError, tf.errors.UnimplementedError) as e:
+            # TensorFlow builds without XLA: same loop as a plain graph
+            print(f"⚠️ XLA rollout unavailable ({type(e).__name__}), using the plain graph")
+            self._rollout = tf.function(self._rollout_graph, input_signature=self._rollout_spec)
+            return self._rollout(X, iterations)
+
+    def warmup(self):
+        """Trace the graph up front so the first request doesn't pay for it."""
+        self.predict(np.zeros((1,) + self.input_shape, dtype=np.float32))
+
+    def predict(self, X):
+        return self._call(tf.convert_to_tensor(X, dtype=tf.float32)).numpy()
+
+    def forecast(self, X, steps):
+        """Predict the next `steps` values for each window in X, shape (batch, steps)."""
+        if steps <= self.horizon:
+            return self.predict(X)[:, :steps]
+        if self.input_shape[-1] != 1 or self.horizon > self.input_shape[0]:
+            raise ValueError("Recursive rollout needs a univariate model with horizon <= window")
+        iterations = -(-steps // self.horizon)
+        if iterations > ROLLOUT_MAX_ITERATIONS:
+            raise ValueError(f"Rollout is limited to {ROLLOUT_MAX_ITERATIONS * self.horizon} steps")
+
+        X = np.asarray(X, dtype=np.float32)
+        batch = len(X)
+        padded = 1 << (batch - 1).bit_length()
+        if padded != batch:
+            X = np.concatenate([X, np.zeros((padded - batch,) + X.shape[1:], dtype=np.float32)])
+        path = self._run_rollout(tf.convert_to_tensor(X), tf.constant(iterations, dtype=tf.int32))
+        return path.numpy()[:batch, :steps]
+
+
+def load_compiled_model(model_path):
+    compiled = CompiledModel(keras.models.load_model(model_path))
+    compiled.warmup()
+    return compiled
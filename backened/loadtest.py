@@ -0,0 +1,139 @@
+"""
+Load test for comparing serving modes: requests/s, latency and server memory.
+
+Start the server in one mode, then point the load test at it:
+
+    gunicorn --chdir backened --workers 2 --bind 127.0.0.1:5001 app:app
+    uvicorn --app-dir backened asgi:app --host 127.0.0.1 --port 5001
+
+    python backened/loadtest.py --url http://127.0.0.1:5001 --pid <server pid>
+
+--pid is the gunicorn master or the uvicorn process; the RSS of it and all
+its children is sampled during the run and the peak is reported.
+
+Usage: python backened/loadtest.py [--url ...] [--concurrency 32] [--duration 20]
+                                   [--mix predict,stats,health] [--coins BTC,ETH] [--pid PID]
+"""
+import argparse
+import os
+import random
+import threading
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import requests
+
+
+def process_tree_rss(pid):
+    """Resident memory in bytes of pid and all of its descendants (Linux /proc)."""
+    children = {}
+    for entry in os.listdir("/proc"):
+        if entry.isdigit():
+            try:
+                with open(f"/proc/{entry}/stat") as f:
+                    ppid = int(f.read().rsplit(")", 1)[1].split()[1])
+            except (OSError, IndexError, ValueError):
+                continue
+            children.setdefault(ppid, []).append(int(entry))
+
+    total, stack = 0, [pid]
+    while stack:
+        current = stack.pop()
+        try:
+            with open(f"/proc/{current}/status") as f:
+                for line in f:
+                    if line.startswith("VmRSS:"):
+                        total += int(line.split()[1]) * 1024
+        except OSError:
+            continue
+        stack.extend(children.get(current, []))
+    return total
+
+
+class MemorySampler(threading.Thread):
+    def __init__(self, pid, interval=0.5):
+        super().__init__(daemon=True)
+        self.pid = pid
+        self.interval = interval
+        self.peak = 0
+        self._done = threading.Event()
+
+    def run(self):
+        while not self._done.is_set():
+            self.peak = max(self.peak, process_tree_rss(self.pid))
+            self._done.wait(self.interval)
+
+    def stop(self):
+        self._done.set()
+        self.join()
+
+
+def make_request(session, url, kind, coins):
+    if kind == "predict":
+        body = {"coin": random.choice(coins), "timeframe": "hourly", "user_id": "loadtest"}
+        return session.post(f"{url}/predict", json=body, timeout=60)
+    if kind == "stats":
+        return session.get(f"{url}/api/user/stats/loadtest", timeout=60)
+    return session.get(f"{url}/health", timeout=60)
+
+
+def worker(url, mix, coins, deadline):
+    session = requests.Session()
+    latencies, statuses = [], Counter()
+    while time.perf_counter() < deadline:
+        kind = random.choice(mix)
+        start = time.perf_counter()
+        try:
+            status = make_request(session, url, kind, coins).status_code
+        except requests.RequestException:
+            status = "error"
+        latencies.append(time.perf_counter() - start)
+        statuses[status] += 1
+    return latencies, statuses
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--url", default="http://127.0.0.1:5001")
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--duration", type=float, default=20)
+    parser.add_argument("--mix", default="predict,stats,health")
+    parser.add_argument("--coins", default="BTC")
+    parser.add_argument("--pid", type=int, help="server process to measure memory of")
+    args = parser.parse_args()
+
+    url = args.url.rstrip("/")
+    mix = args.mix.split(",")
+    coins = args.coins.split(",")
+
+    # Warm up: load models and fill caches before measuring
+    for coin in coins:
+        requests.post(f"{url}/predict", json={"coin": coin, "user_id": "loadtest"}, timeout=120)
+
+    sampler = MemorySampler(args.pid) if args.pid else None
+    if sampler:
+        sampler.start()
+
+    print(f"🚀 {args.concurrency} clients for {args.duration:.0f}s against {url} ({','.join(mix)})")
+    started = time.perf_counter()
+    deadline = started + args.duration
+    with ThreadPoolExecutor(args.concurrency) as pool:
+        results = list(pool.map(lambda _: worker(url, mix, coins, deadline), range(args.concurrency)))
+    elapsed = time.perf_counter() - started
+
+    if sampler:
+        sampler.stop()
+
+    latencies = np.array([t for lat, _ in results for t in lat]) * 1000
+    statuses = sum((s for _, s in results), Counter())
+    print(f"📊 {len(latencies) / elapsed:,.1f} req/s, {len(latencies):,} requests, statuses {dict(statuses)}")
+    print(f"   latency p50 {np.percentile(latencies, 50):.1f} ms, p95 {np.percentile(latencies, 95):.1f} ms, "
+          f"p99 {np.percentile(latencies, 99):.1f} ms")
+    if sampler:
+        print(f"   server peak RSS {sampler.peak / 1e6:,.0f} MB")
+
+
+if __name__ == "__main__":
+    main()
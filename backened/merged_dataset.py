@@ -0,0 +1,169 @@
+"""
+Streaming builder for the all_crypto_inr_*_merged.csv datasets.
+
+Per-coin CSVs are already sorted by TIMESTAMP, so instead of concatenating
+and re-sorting full histories they are read row by row and k-way merged on
+(TIMESTAMP, Cryptocurrency). Memory stays flat regardless of history size.
+
+Appends track a watermark per coin file (its newest TIMESTAMP in the
+merged file, keyed on the file stem such as btc_inr), so a coin that lags behind the others still gets its late rows
+appended once they arrive. Those rows can land after newer rows of other
+coins: a merged file is sorted within each coin, and globally only up to
+the point where a coin first lagged. A full rebuild restores global order.
+"""
+import csv
+import heapq
+import os
+import re
+from datetime import datetime, timezone
+
+import pandas as pd
+
+PRICE_COLUMNS = ["OPEN", "HIGH", "LOW", "CLOSE"]
+COIN_COLUMN = "Cryptocurrency"
+HOURLY_DATE_FORMAT = "%Y-%m-%d %H:%M:%S"
+DAILY_DATE_FORMAT = "%Y-%m-%d"
+
+
+def coin_key(filename):
+    """btc_inr_hourly.csv -> btc_inr, the file stem watermarks are keyed on."""
+    stem = os.path.splitext(os.path.basename(filename))[0]
+    return re.sub(r"_(hourly|daily)$", "", stem)
+
+
+def coin_from_filename(filename):
+    """btc_inr_hourly.csv -> Btc, bitcoin_cash_inr_hourly.csv -> Bitcoin_cash."""
+    return re.sub(r"_inr$", "", coin_key(filename)).capitalize()
+
+
+def read_header(csv_path):
+    with open(csv_path, newline="") as f:
+        return next(csv.reader(f), [])
+
+
+def merged_columns(csv_files):
+    """Union of the per-coin headers in order of first appearance, plus the coin column."""
+    columns = []
+    for csv_path in csv_files:
+        for col in read_header(csv_path):
+            if col not in columns and col != COIN_COLUMN:
+                columns.append(col)
+    return columns + [COIN_COLUMN]
+
+
+def merged_watermarks(output_file, keys, chunksize=200_000):
+    """{coin key: newest TIMESTAMP} of a merged file for the given keys, or None when it doesn't exist yet."""
+    if not os.path.exists(output_file) or os.path.getsize(output_file) == 0:
+        return None
+    labels = {coin_from_filename(key): key for key in keys}
+    watermarks = {}
+    for chunk in pd.read_csv(output_file, usecols=["TIMESTAMP", COIN_COLUMN], chunksize=chunksize):
+        for coin, ts in chunk.groupby(COIN_COLUMN)["TIMESTAMP"].max().items():
+            key = labels.get(coin)
+            if key is not None:
+                watermarks[key] = max(int(ts), watermarks.get(key, int(ts)))
+    return watermarks
+
+
+def iter_coin_rows(csv_path, coin, columns, date_format, after_ts=None, min_price=1):
+    """
+    Yield (timestamp, coin, row) for one per-coin CSV, streaming line by line.
+
+    Rows with a bad TIMESTAMP, a price below `min_price` or a timestamp at or
+    before `after_ts` are skipped. DATE is rewritten from TIMESTAMP so every
+    coin ends up in one format.
+    """
+    with open(csv_path, newline="") as f:
+        reader = csv.DictReader(f)
+        previous_ts = None
+        for rec in reader:
+            try:
+                ts = int(float(rec["TIMESTAMP"]))
+                prices = [float(rec[col]) for col in PRICE_COLUMNS]
+            except (KeyError, TypeError, ValueError):
+                continue
+
+            if previous_ts is not None and ts < previous_ts:
+                raise ValueError(f"{csv_path} is not sorted by TIMESTAMP (at {ts})")
+            previous_ts = ts
+
+            if after_ts is not None and ts <= after_ts:
+                continue
+            if min(prices) < min_price:
+                continue
+
+            rec["DATE"] = datetime.fromtimestamp(ts, tz=timezone.utc).strftime(date_format)
+            rec[COIN_COLUMN] = coin
+            yield ts, coin, [rec.get(col, "") for col in columns]
+
+
+def write_rows(output_file, columns, rows, append):
+    """Write merged rows; returns how many were written."""
+    written = 0
+    with open(output_file, "a" if append else "w", newline="") as f:
+        writer = csv.writer(f)
+        if not append:
+            writer.writerow(columns)
+        for _, _, row in rows:
+            writer.writerow(row)
+            written += 1
+    return written
+
+
+def merge_csv_files(csv_files, output_file, date_format=HOURLY_DATE_FORMAT, incremental=False, min_price=1):
+    """
+    K-way merge per-coin CSVs into `output_file`.
+
+    With `incremental`, only each coin's rows newer than its own last
+    TIMESTAMP in the merged file are appended; otherwise the file is rebuilt
+    from scratch. Returns the number of rows written.
+    """
+    watermarks = merged_watermarks(output_file, map(coin_key, csv_files)) if incremental else None
+    append = watermarks is not None
+
+    columns = read_header(output_file) if append else merged_columns(csv_files)
+    streams = []
+    for csv_path in csv_files:
+        coin = coin_from_filename(csv_path)
+        after_ts = watermarks.get(coin_key(csv_path)) if append else None
+        streams.append(iter_coin_rows(csv_path, coin, columns, date_format, after_ts, min_price))
+    merged = heapq.merge(*streams, key=lambda item: (item[0], item[1]))
+    return write_rows(output_file, columns, merged, append)
+
+
+def append_frames(output_file, frames, date_format, watermarks):
+    """
+    Append freshly synced candles from several coins to a merged dataset.
+
+    `frames` maps coin key (btc_inr) -> DataFrame of new rows (already
+    TIMESTAMP sorted). Rows are interleaved by (TIMESTAMP, Cryptocurrency) and each
+    coin's rows newer than its entry in `watermarks` are written (all of
+    them for a coin without one); history is never re-read.
+    Returns (written, skipped, updated watermarks).
+    """
+    columns = read_header(output_file)
+    streams, keys = [], {}
+    for key, df in frames.items():
+        if df is None or df.empty:
+            continue
+        coin = coin_from_filename(key)
+        keys[coin] = key
+        df = df.assign(**{COIN_COLUMN: coin})
+        df["DATE"] = pd.to_datetime(df["TIMESTAMP"], unit="s").dt.strftime(date_format)
+        rows = df.reindex(columns=columns)
+        rows = rows.astype(object).where(rows.notna(), "")
+        streams.append(zip(df["TIMESTAMP"].astype(int), df[COIN_COLUMN], rows.values.tolist()))
+
+    merged = heapq.merge(*streams, key=lambda item: (item[0], item[1]))
+    watermarks = dict(watermarks)
+    fresh, skipped = [], 0
+    for item in merged:
+        ts, key = item[0], keys[item[1]]
+        if key in watermarks and ts <= watermarks[key]:
+            skipped += 1
+        else:
+            fresh.append(item)
+            watermarks[key] = int(ts)
+    if not fresh:
+        return 0, skipped, watermarks
+    return write_rows(output_file, columns, fresh, append=True), skipped, watermarks
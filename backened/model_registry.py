@@ -0,0 +1,157 @@
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, wait
+
+from inference import load_compiled_model
+from scaling import load_scaler
+
+TIMEFRAMES = ("hourly", "daily")
+
+
+def parse_preload_targets(spec, coins):
+    """
+    Turn a PRELOAD_MODELS value into (timeframe, coin) pairs.
+
+    "all" preloads every coin in both timeframes, "none" (or empty) disables
+    preloading, otherwise a comma list such as "BTC,ETH:daily" is expected.
+    """
+    spec = (spec or "").strip()
+    if spec.lower() == "all":
+        return [(timeframe, coin) for timeframe in TIMEFRAMES for coin in coins]
+    if not spec or spec.lower() == "none":
+        return []
+
+    targets = []
+    for item in spec.split(","):
+        coin, _, timeframe = item.strip().partition(":")
+        for tf_name in ([timeframe] if timeframe else TIMEFRAMES):
+            targets.append((tf_name, coin.upper()))
+    return targets
+
+
+class ModelRegistry:
+    """
+    Process-wide cache of compiled models keyed by (timeframe, coin).
+
+    Each model is loaded exactly once: concurrent first requests for the same
+    key wait on a per-key lock instead of loading a second copy. Load time
+    includes tracing the inference graph. When `scaler_dir` is given, the
+    training-time scaler with the same name is loaded alongside the model.
+    """
+
+    def __init__(self, model_dir, name_map, name_overrides=None, scaler_dir=None):
+        self.model_dir = model_dir
+        self.scaler_dir = scaler_dir
+        self.name_map = name_map
+        self.name_overrides = name_overrides or {}
+        self._models = {}
+        self._scalers = {}
+        self._load_times = {}
+        self._errors = {}
+        self._key_locks = {}
+        self._lock = threading.Lock()
+        self._pending = set()
+        self._preload_started = False
+
+    def artifact_name(self, timeframe, coin):
+        return self.name_overrides.get(timeframe, {}).get(coin) or self.name_map.get(coin)
+
+    def model_path(self, timeframe, coin):
+        mapped_name = self.artifact_name(timeframe, coin)
+        if not mapped_name:
+            return None
+        return os.path.join(self.model_dir, timeframe, f"{mapped_name}.keras")
+
+    def scaler_path(self, timeframe, coin):
+        mapped_name = self.artifact_name(timeframe, coin)
+        if not mapped_name or not self.scaler_dir:
+            return None
+        return os.path.join(self.scaler_dir, timeframe, f"{mapped_name}.joblib")
+
+    def get(self, timeframe, coin):
+        key = (timeframe, coin)
+        model = self._models.get(key)
+        if model is not None:
+            return model
+
+        model_path = self.model_path(timeframe, coin)
+        if not model_path or not os.path.exists(model_path):
+            return None
+
+        with self._lock:
+            key_lock = self._key_locks.setdefault(key, threading.Lock())
+
+        with key_lock:
+            # Another thread may have finished loading while we waited
+            model = self._models.get(key)
+            if model is not None:
+                return model
+
+            print(f"📦 Loading {timeframe} model for {coin} from {os.path.basename(model_path)}...")
+            started = time.perf_counter()
+            try:
+                model = load_compiled_model(model_path)
+                scaler = load_scaler(self.scaler_path(timeframe, coin))
+            except Exception as e:
+                print(f"❌ Error loading model: {e}")
+                self._errors[key] = str(e)
+                return None
+
+            if scaler is None:
+                print(f"⚠️ No training scaler for {timeframe} {coin}, requests will fit one on their own window")
+
+            self._load_times[key] = time.perf_counter() - started
+            self._errors.pop(key, None)
+            self._scalers[key] = scaler
+            self._models[key] = model
+            print(f"✅ Loaded {timeframe} model for {coin} in {self._load_times[key]:.2f}s")
+            return model
+
+    def get_scaler(self, timeframe, coin):
+        """Training-time scaler for a loaded model, or None if no artifact exists."""
+        return self._scalers.get((timeframe, coin))
+
+    def preload(self, targets, max_workers=4, budget=None):
+        """
+        Load `targets` in parallel, waiting at most `budget` seconds.
+
+        Loads that are still running when the budget runs out keep going in
+        the background; `status()` reports ready once all of them finished.
+        """
+        targets = [key for key in targets if self.model_path(*key)]
+        with self._lock:
+            self._preload_started = True
+            self._pending.update(targets)
+        if not targets:
+            return
+
+        def load(key):
+            try:
+                self.get(*key)
+            finally:
+                with self._lock:
+                    self._pending.discard(key)
+
+        print(f"🔥 Preloading {len(targets)} models with {max_workers} workers...")
+        started = time.perf_counter()
+        executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="model-preload")
+        futures = [executor.submit(load, key) for key in targets]
+        done, not_done = wait(futures, timeout=budget)
+        executor.shutdown(wait=False)
+
+        if not_done:
+            print(f"⏳ Startup budget of {budget}s spent, {len(not_done)} models still loading in background")
+        else:
+            print(f"✅ Preloaded {len(targets)} models in {time.perf_counter() - started:.2f}s")
+
+    def status(self):
+        with self._lock:
+            pending = sorted(self._pending)
+        return {
+            "ready": self._preload_started and not pending,
+            "loaded": {f"{coin}:{timeframe}": round(seconds, 3) for (timeframe, coin), seconds in sorted(self._load_times.items())},
+            "failed": {f"{coin}:{timeframe}": error for (timeframe, coin), error in sorted(self._errors.items())},
+            "pending": [f"{coin}:{timeframe}" for timeframe, coin in pending],
+            "missingScalers": [f"{coin}:{timeframe}" for (timeframe, coin), scaler in sorted(self._scalers.items()) if scaler is None],
+        }
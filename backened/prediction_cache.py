@@ -0,0 +1,54 @@
+import threading
+from collections import OrderedDict
+
+
+class PredictionCache:
+    """
+    Bounded LRU cache of model outputs keyed by (coin, timeframe, last candle TIMESTAMP).
+
+    Any request made before the next candle lands sees the same input window,
+    so it can reuse the stored prediction. A new candle changes the key by
+    itself; `invalidate()` additionally drops stale entries once the sync
+    appends data so they don't sit in the LRU until evicted.
+    """
+
+    def __init__(self, max_size=256):
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            value = self._entries.get(key)
+            if value is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, key, value):
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, coin=None, timeframe=None):
+        with self._lock:
+            for key in list(self._entries):
+                if (coin is None or key[0] == coin) and (timeframe is None or key[1] == timeframe):
+                    del self._entries[key]
+
+    def stats(self):
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "size": len(self._entries),
+                "maxSize": self.max_size,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hitRate": round(self.hits / total, 4) if total else 0.0,
+            }
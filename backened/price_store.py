@@ -0,0 +1,230 @@
+"""
+Columnar on-disk price store.
+
+Each series (e.g. hourly/btc_inr) is a directory with two raw little-endian
+files that are memory-mapped on read:
+
+    timestamps.i8   int64 candle open times, strictly increasing
+    ohlcv.f8        float64 rows of OPEN, HIGH, LOW, CLOSE, VOLUME
+
+    meta.json       the CSV's column order, its constant UNIT/TYPE/MARKET/
+                    INSTRUMENT values and DATE format, so exports match it
+
+Reads return zero-copy NumPy views, so the last 60 candles are a slice of a
+mapped file instead of a CSV parse. Appends only add bytes at the end.
+
+Usage:
+    python backened/price_store.py import             # all milestone-1 CSVs
+    python backened/price_store.py export hourly btc_inr out.csv
+"""
+import json
+import os
+import sys
+import threading
+
+import numpy as np
+import pandas as pd
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+STORE_PATH = os.path.join(BASE_DIR, "milestone-1", "store")
+
+COLUMNS = ("OPEN", "HIGH", "LOW", "CLOSE", "VOLUME")
+CLOSE = COLUMNS.index("CLOSE")
+TIMESTAMP_FILE = "timestamps.i8"
+OHLCV_FILE = "ohlcv.f8"
+META_FILE = "meta.json"
+CONSTANT_COLUMNS = ("UNIT", "TYPE", "MARKET", "INSTRUMENT")
+DATE_FORMATS = ("%d-%m-%Y %H.%M", "%Y-%m-%d", "%Y-%m-%d %H:%M:%S")
+ROW_BYTES = 8 * len(COLUMNS)
+
+
+class PriceSeries:
+    def __init__(self, path):
+        self.path = path
+        self._ts_path = os.path.join(path, TIMESTAMP_FILE)
+        self._ohlcv_path = os.path.join(path, OHLCV_FILE)
+        self._meta_path = os.path.join(path, META_FILE)
+        self._lock = threading.Lock()
+        self._mapped_size = None
+        self._ts = np.empty(0, dtype="<i8")
+        self._ohlcv = np.empty((0, len(COLUMNS)), dtype="<f8")
+
+    def exists(self):
+        return os.path.exists(self._ts_path)
+
+    def _views(self):
+        """Current (timestamps, ohlcv) views, re-mapped only when the files grew."""
+        if not self.exists():
+            return self._ts, self._ohlcv
+        size = os.path.getsize(self._ts_path)
+        with self._lock:
+            if size != self._mapped_size:
+                # Timestamps are written last, so they bound the complete rows
+                n = min(size // 8, os.path.getsize(self._ohlcv_path) // ROW_BYTES)
+                if n:
+                    self._ts = np.memmap(self._ts_path, dtype="<i8", mode="r", shape=(n,))
+                    self._ohlcv = np.memmap(self._ohlcv_path, dtype="<f8", mode="r", shape=(n, len(COLUMNS)))
+                self._mapped_size = size
+            return self._ts, self._ohlcv
+
+    def __len__(self):
+        return len(self._views()[0])
+
+    def last_timestamp(self):
+        ts, _ = self._views()
+        return int(ts[-1]) if len(ts) else None
+
+    def tail(self, n):
+        ts, ohlcv = self._views()
+        return ts[-n:], ohlcv[-n:]
+
+    def range(self, start_ts=None, end_ts=None):
+        """Rows with start_ts <= TIMESTAMP <= end_ts (either bound optional)."""
+        ts, ohlcv = self._views()
+        lo = 0 if start_ts is None else np.searchsorted(ts, start_ts, side="left")
+        hi = len(ts) if end_ts is None else np.searchsorted(ts, end_ts, side="right")
+        return ts[lo:hi], ohlcv[lo:hi]
+
+    def meta(self):
+        try:
+            with open(self._meta_path) as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def set_meta(self, meta):
+        os.makedirs(self.path, exist_ok=True)
+        tmp_path = f"{self._meta_path}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(meta, f, indent=2)
+        os.replace(tmp_path, self._meta_path)
+
+    def append(self, timestamps, ohlcv):
+        """Append rows newer than the last stored timestamp; returns how many were written."""
+        timestamps = np.asarray(timestamps, dtype="<i8")
+        ohlcv = np.asarray(ohlcv, dtype="<f8").reshape(-1, len(COLUMNS))
+
+        order = np.argsort(timestamps, kind="stable")
+        timestamps, ohlcv = timestamps[order], ohlcv[order]
+        last_ts = self.last_timestamp()
+        keep = np.ones(len(timestamps), dtype=bool)
+        keep[1:] = timestamps[1:] != timestamps[:-1]
+        if last_ts is not None:
+            keep &= timestamps > last_ts
+        timestamps, ohlcv = timestamps[keep], ohlcv[keep]
+        if not len(timestamps):
+            return 0
+
+        os.makedirs(self.path, exist_ok=True)
+        with open(self._ohlcv_path, "ab") as f:
+            f.write(np.ascontiguousarray(ohlcv).tobytes())
+        with open(self._ts_path, "ab") as f:
+            f.write(timestamps.tobytes())
+        return len(timestamps)
+
+
+class PriceStore:
+    def __init__(self, root=STORE_PATH):
+        self.root = root
+        self._series = {}
+        self._lock = threading.Lock()
+
+    def series(self, timeframe, name):
+        key = (timeframe, name)
+        with self._lock:
+            if key not in self._series:
+                self._series[key] = PriceSeries(os.path.join(self.root, timeframe, name))
+            return self._series[key]
+
+
+def frame_to_columns(df):
+    """TIMESTAMP and OHLCV arrays from a CSV-shaped frame; missing columns become NaN."""
+    ohlcv = np.column_stack([
+        df[col].to_numpy(dtype=np.float64) if col in df.columns else np.full(len(df), np.nan)
+        for col in COLUMNS
+    ])
+    return df["TIMESTAMP"].to_numpy(dtype=np.int64), ohlcv
+
+
+def csv_meta(df):
+    """Column order, constant columns and DATE format of a CSV-shaped frame."""
+    first = df.iloc[0]
+    meta = {
+        "columns": list(df.columns),
+        "constants": {col: str(first[col]) for col in CONSTANT_COLUMNS if col in df.columns},
+        "date_format": None,  # DATE isn't stored; exports re-derive it from TIMESTAMP
+    }
+    if "DATE" in df.columns:
+        date = pd.to_datetime(int(first["TIMESTAMP"]), unit="s")
+        meta["date_format"] = next((fmt for fmt in DATE_FORMATS if date.strftime(fmt) == str(first["DATE"])), DATE_FORMATS[-1])
+    return meta
+
+
+def import_csv(csv_path, series):
+    """
+    Import a per-coin CSV in any row order; rows already in the store are skipped.
+
+    Duplicate timestamps keep the last row, as records_to_frame does. Raises
+    ValueError when the CSV has rows older than the store's last candle that
+    the store doesn't hold, since appends can't fill them in.
+    """
+    df = pd.read_csv(csv_path, float_precision="round_trip")
+    if df.empty:
+        return 0
+    df = df.sort_values("TIMESTAMP", kind="stable").drop_duplicates("TIMESTAMP", keep="last")
+    timestamps, ohlcv = frame_to_columns(df)
+
+    stored_ts, _ = series.range()
+    if len(stored_ts):
+        older = timestamps[timestamps <= stored_ts[-1]]
+        missing = np.count_nonzero(~np.isin(older, stored_ts))
+        if missing:
+            raise ValueError(f"{csv_path} has {missing} rows older than {series.path}'s last candle that it doesn't hold; "
+                             f"remove the series and import again")
+
+    series.set_meta(csv_meta(df))
+    return series.append(timestamps, ohlcv)
+
+
+def export_csv(series, csv_path, start_ts=None, end_ts=None):
+    """Write a range of the series back out with the imported CSV's columns and order."""
+    meta = series.meta()
+    if meta is None:
+        raise ValueError(f"{series.path} has no {META_FILE}; run the import again to record the CSV schema")
+
+    ts, ohlcv = series.range(start_ts, end_ts)
+    ts, ohlcv = np.asarray(ts), np.asarray(ohlcv)
+    data = {"TIMESTAMP": ts}
+    data.update({col: ohlcv[:, i] for i, col in enumerate(COLUMNS)})
+    data.update({col: value for col, value in meta["constants"].items()})
+    if meta["date_format"]:
+        data["DATE"] = pd.to_datetime(ts, unit="s").strftime(meta["date_format"])
+
+    df = pd.DataFrame({col: data[col] for col in meta["columns"] if col in data}, index=range(len(ts)))
+    df.to_csv(csv_path, index=False)
+    return len(df)
+
+
+def main():
+    from data_sync import HOURLY_PATH, DAILY_PATH, FILE_MAP
+
+    if len(sys.argv) >= 2 and sys.argv[1] == "import":
+        store = PriceStore()
+        for timeframe, folder in (("hourly", HOURLY_PATH), ("daily", DAILY_PATH)):
+            for name in FILE_MAP.values():
+                csv_path = os.path.join(folder, f"{name}_{timeframe}.csv")
+                if not os.path.exists(csv_path):
+                    print(f"Skipping {csv_path}: not found")
+                    continue
+                written = import_csv(csv_path, store.series(timeframe, name))
+                print(f"✅ Imported {written} rows into {timeframe}/{name}")
+    elif len(sys.argv) == 5 and sys.argv[1] == "export":
+        _, _, timeframe, name, csv_path = sys.argv
+        rows = export_csv(PriceStore().series(timeframe, name), csv_path)
+        print(f"✅ Exported {rows} rows to {csv_path}")
+    else:
+        print(__doc__)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+import io
+import os
+import threading
+
+import pandas as pd
+
+# Bytes read per backwards step when looking for the last N lines
+TAIL_BLOCK_SIZE = 64 * 1024
+
+
+def read_tail(file_path, n, block_size=TAIL_BLOCK_SIZE):
+    """Parse only the last `n` rows of a CSV by seeking backwards from the end of the file."""
+    with open(file_path, "rb") as f:
+        header = f.readline()
+        data_start = f.tell()
+        f.seek(0, os.SEEK_END)
+        pos = f.tell()
+
+        chunk = b""
+        # n rows need n+1 newlines so that the first row is known to be complete
+        while pos > data_start and chunk.count(b"\n") <= n:
+            step = min(block_size, pos - data_start)
+            pos -= step
+            f.seek(pos)
+            chunk = f.read(step) + chunk
+
+    lines = chunk.split(b"\n")
+    if pos > data_start:
+        lines = lines[1:]  # first line may be cut in half
+    lines = [line for line in lines if line.strip()][-n:]
+    return pd.read_csv(io.BytesIO(header + b"\n".join(lines)))
+
+
+class PriceWindowCache:
+    """
+    In-process ring buffer of the last `window` rows per (coin, timeframe) CSV.
+
+    The buffer is only touched when the file's mtime/size changes. Appended
+    bytes (the data sync only ever appends) are parsed on their own, anything
+    else (file replaced or truncated) triggers a fresh tail read.
+    """
+
+    def __init__(self, window):
+        self.window = window
+        self._entries = {}
+        self._lock = threading.Lock()
+
+    def get(self, key, file_path):
+        stat = os.stat(file_path)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry and entry["path"] == file_path and (entry["mtime"], entry["size"]) == (stat.st_mtime_ns, stat.st_size):
+                return entry["df"]
+
+            appended = None
+            if entry and entry["path"] == file_path and stat.st_size > entry["offset"]:
+                appended = self._read_appended(entry, file_path)
+
+            if appended is None:
+                df = read_tail(file_path, self.window)
+                offset = stat.st_size
+            else:
+                df, consumed = appended
+                offset = entry["offset"] + consumed
+
+            self._entries[key] = {
+                "path": file_path,
+                "mtime": stat.st_mtime_ns,
+                "size": stat.st_size,
+                "offset": offset,
+                "df": df,
+            }
+            return df
+
+    def _read_appended(self, entry, file_path):
+        with open(file_path, "rb") as f:
+            f.seek(entry["offset"])
+            new_bytes = f.read()
+
+        # Ignore a trailing partial row while the sync is still writing it
+        consumed = new_bytes.rfind(b"\n") + 1
+        if consumed == 0:
+            return entry["df"], 0
+
+        old = entry["df"]
+        try:
+            new = pd.read_csv(io.BytesIO(new_bytes[:consumed]), header=None, names=old.columns)
+        except Exception:
+            return None
+        df = pd.concat([old, new], ignore_index=True).tail(self.window).reset_index(drop=True)
+        return df, consumed
+
+    def invalidate(self, key=None):
+        with self._lock:
+            if key is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(key, None)
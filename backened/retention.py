@@ -0,0 +1,181 @@
+"""
+Retention for the predictions table.
+
+Raw rows older than RETENTION_DAYS (ANONYMOUS_RETENTION_DAYS for the
+"anonymous" user) are, one month partition and batch at a time:
+
+    1. copied into archive/predictions_YYYY_MM.db by the month they were made,
+    2. rolled up into prediction_daily (day, coin, timeframe, user_id),
+    3. deleted from the hot database.
+
+Step 1 commits on its own: in WAL mode a transaction spanning two database
+files isn't atomic, so the archive is written first and steps 2 and 3
+follow in one transaction on the hot database. The archive insert is
+idempotent, so an interrupted run can simply be repeated. user_stats keeps
+lifetime totals, so archived rows still count on the profile page. Freed
+pages go back to the filesystem through incremental vacuum; databases
+created before it was enabled need a one-time VACUUM (--vacuum), which
+locks the file for its duration and so is never run by the server.
+
+Usage:
+    python backened/retention.py            # apply retention now
+    python backened/retention.py --vacuum   # enable incremental vacuum first
+"""
+import os
+import sys
+from datetime import datetime, timedelta
+
+from database import get_db_connection
+
+RETENTION_DAYS = int(os.environ.get("RETENTION_DAYS", 90))
+ANONYMOUS_RETENTION_DAYS = int(os.environ.get("ANONYMOUS_RETENTION_DAYS", 7))
+RETENTION_BATCH = int(os.environ.get("RETENTION_BATCH", 5000))
+ARCHIVE_DIR = os.environ.get("ARCHIVE_DIR", os.path.join(os.path.dirname(os.path.abspath(__file__)), "archive"))
+ANONYMOUS_USER = "anonymous"
+
+
+def archive_path(month, archive_dir=ARCHIVE_DIR):
+    return os.path.join(archive_dir, f"predictions_{month.replace('-', '_')}.db")
+
+
+def incremental_vacuum_enabled(conn):
+    return conn.execute("PRAGMA auto_vacuum").fetchone()[0] == 2
+
+
+def ensure_incremental_vacuum(conn):
+    """Switch the database to auto_vacuum=INCREMENTAL; existing files need one full VACUUM."""
+    if incremental_vacuum_enabled(conn):
+        return
+    print("🧹 Enabling incremental vacuum (one-time VACUUM)...")
+    conn.commit()
+    conn.execute("PRAGMA auto_vacuum=INCREMENTAL")
+    conn.execute("VACUUM")
+
+
+def _archive_schema(conn):
+    columns = conn.execute("PRAGMA main.table_info(predictions)").fetchall()
+    defs = ", ".join(
+        f"{c['name']} INTEGER PRIMARY KEY" if c["name"] == "id" else f"{c['name']} {c['type']}"
+        for c in columns
+    )
+    return f"CREATE TABLE IF NOT EXISTS archive.predictions ({defs})"
+
+
+def _expired_months(conn, cutoff, anonymous_cutoff):
+    return [row[0] for row in conn.execute(
+        "SELECT DISTINCT substr(timestamp, 1, 7) FROM predictions "
+        "WHERE timestamp < ? OR (user_id = ? AND timestamp < ?) ORDER BY 1",
+        (cutoff, ANONYMOUS_USER, anonymous_cutoff),
+    )]
+
+
+def _move_batch(conn, month, cutoff, anonymous_cutoff, batch_size):
+    """Archive, roll up and delete up to batch_size expired rows of one month; returns rows moved."""
+    conn.execute("DELETE FROM temp.retention_batch")
+    conn.execute(
+        "INSERT INTO temp.retention_batch (id) "
+        "SELECT id FROM predictions "
+        "WHERE timestamp >= ? AND timestamp < ? "
+        "AND (timestamp < ? OR (user_id = ? AND timestamp < ?)) "
+        "LIMIT ?",
+        (month, month + "~", cutoff, ANONYMOUS_USER, anonymous_cutoff, batch_size),
+    )
+    moved = conn.execute("SELECT COUNT(*) FROM temp.retention_batch").fetchone()[0]
+    if not moved:
+        conn.commit()
+        return 0
+
+    batch = "SELECT id FROM temp.retention_batch"
+    conn.execute(f"INSERT OR IGNORE INTO archive.predictions SELECT * FROM main.predictions WHERE id IN ({batch})")
+    conn.commit()
+
+    conn.execute(f'''
+    INSERT INTO prediction_daily (day, coin, timeframe, user_id, predictions, scored, correct, abs_pct_error)
+    SELECT substr(timestamp, 1, 10), coin, timeframe, COALESCE(user_id, ''),
+           COUNT(*), COUNT(is_correct), COALESCE(SUM(is_correct), 0),
+           COALESCE(SUM(ABS(actual_price - predicted_price) * 100.0 / NULLIF(actual_price, 0)), 0)
+    FROM main.predictions WHERE id IN ({batch})
+    GROUP BY 1, 2, 3, 4
+    ON CONFLICT (day, coin, timeframe, user_id) DO UPDATE SET
+        predictions = predictions + excluded.predictions,
+        scored = scored + excluded.scored,
+        correct = correct + excluded.correct,
+        abs_pct_error = abs_pct_error + excluded.abs_pct_error
+    ''')
+    # The delete trigger decrements user_stats; add the rows back so totals stay lifetime
+    conn.execute(f'''
+    UPDATE user_stats SET
+        total = total + b.n, scored = scored + b.s, correct = correct + b.c
+    FROM (
+        SELECT user_id, COUNT(*) AS n, COUNT(is_correct) AS s, COALESCE(SUM(is_correct), 0) AS c
+        FROM main.predictions WHERE id IN ({batch}) GROUP BY user_id
+    ) AS b
+    WHERE user_stats.user_id = b.user_id
+    ''')
+    conn.execute(f"DELETE FROM main.predictions WHERE id IN ({batch})")
+    conn.commit()
+    return moved
+
+
+def run_retention(conn=None, now=None, retention_days=RETENTION_DAYS,
+                  anonymous_retention_days=ANONYMOUS_RETENTION_DAYS,
+                  batch_size=RETENTION_BATCH, archive_dir=ARCHIVE_DIR):
+    """Apply retention and compact the hot database; returns {month: rows archived}."""
+    conn = conn or get_db_connection()
+    now = now or datetime.now()
+    cutoff = (now - timedelta(days=retention_days)).isoformat()
+    anonymous_cutoff = (now - timedelta(days=anonymous_retention_days)).isoformat()
+
+    conn.commit()
+    conn.execute("CREATE TEMP TABLE IF NOT EXISTS retention_batch (id INTEGER PRIMARY KEY)")
+    conn.commit()
+
+    archived = {}
+    months = _expired_months(conn, cutoff, anonymous_cutoff)
+    if months:
+        os.makedirs(archive_dir, exist_ok=True)
+    for month in months:
+        conn.execute("ATTACH DATABASE ? AS archive", (archive_path(month, archive_dir),))
+        try:
+            conn.execute(_archive_schema(conn))
+            conn.commit()
+            while True:
+                moved = _move_batch(conn, month, cutoff, anonymous_cutoff, batch_size)
+                if not moved:
+                    break
+                archived[month] = archived.get(month, 0) + moved
+            conn.commit()
+        except BaseException:
+            # Never commit half a batch: a rollup without its DELETE would count rows twice
+            conn.rollback()
+            raise
+        finally:
+            conn.execute("DETACH DATABASE archive")
+
+    # Hand freed pages back and keep the WAL from holding on to them
+    # executescript steps the pragma to completion; execute() would free one page
+    conn.executescript("PRAGMA incremental_vacuum;")
+    conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+    if archived and not incremental_vacuum_enabled(conn):
+        print("⚠️ Freed pages stay in the database file; run `python backened/retention.py --vacuum` once to reclaim them")
+    return archived
+
+
+def main():
+    from database import init_db
+
+    init_db()
+    conn = get_db_connection()
+    try:
+        if "--vacuum" in sys.argv:
+            ensure_incremental_vacuum(conn)
+        archived = run_retention(conn)
+    finally:
+        conn.close()
+    for month, rows in archived.items():
+        print(f"📦 Archived {rows} rows to {archive_path(month)}")
+    print(f"✅ Retention done ({sum(archived.values())} rows archived)")
+
+
+if __name__ == "__main__":
+    main()
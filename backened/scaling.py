@@ -0,0 +1,46 @@
+import os
+
+import joblib
+import numpy as np
+
+
+class AffineScaler:
+    """
+    MinMax scaling reduced to precomputed vectors: scaled = x * scale + min.
+
+    Holds the same `scale_`/`min_` a fitted sklearn MinMaxScaler uses, so
+    transforms are a single NumPy multiply-add with no estimator overhead.
+    `source` records where the parameters came from ("training" or "window").
+    """
+
+    def __init__(self, scale, min_, source):
+        self.scale = np.asarray(scale, dtype=np.float64)
+        self.min = np.asarray(min_, dtype=np.float64)
+        self.source = source
+
+    @classmethod
+    def from_sklearn(cls, scaler):
+        return cls(scaler.scale_, scaler.min_, "training")
+
+    @classmethod
+    def fit(cls, values, feature_range=(0, 1)):
+        """Equivalent of MinMaxScaler(feature_range).fit(values)."""
+        values = np.asarray(values, dtype=np.float64)
+        data_min = values.min(axis=0)
+        data_range = values.max(axis=0) - data_min
+        data_range[data_range == 0.0] = 1.0
+        scale = (feature_range[1] - feature_range[0]) / data_range
+        return cls(scale, feature_range[0] - data_min * scale, "window")
+
+    def transform(self, values):
+        return np.asarray(values, dtype=np.float64) * self.scale + self.min
+
+    def inverse_transform(self, values):
+        return (np.asarray(values, dtype=np.float64) - self.min) / self.scale
+
+
+def load_scaler(scaler_path):
+    """Load a joblib-dumped MinMaxScaler as an AffineScaler, or None if the artifact is missing."""
+    if not scaler_path or not os.path.exists(scaler_path):
+        return None
+    return AffineScaler.from_sklearn(joblib.load(scaler_path))
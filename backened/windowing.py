@@ -0,0 +1,75 @@
+"""
+Sliding-window (X, y) builders shared by training, evaluation and backtesting.
+
+make_windows() returns strided views over the series instead of stacking
+copies, so X costs no memory beyond the series itself (the old loop used
+~window times the series size). Views are read-only; np.ascontiguousarray a
+slice if it has to be written to. For series too large to materialise even
+once per fit (e.g. a memory-mapped PriceSeries column), windows_dataset()
+streams contiguous batches through tf.data.
+"""
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+
+def _as_2d(series):
+    series = np.asarray(series)
+    return series.reshape(-1, 1) if series.ndim == 1 else series
+
+
+def make_windows(series, window, horizon=1):
+    """
+    X of shape (n, window, features) and y of shape (n, horizon * features).
+
+    Row i is X[i] = series[i:i+window] and y[i] = series[i+window:i+window+horizon]
+    flattened, the same layout as the notebook's list-append loop. Both are
+    views for single-feature series; y is copied only for multi-feature ones.
+    """
+    series = _as_2d(series)
+    features = series.shape[1]
+    n = len(series) - window - horizon + 1
+    if n <= 0:
+        return np.empty((0, window, features), series.dtype), np.empty((0, horizon * features), series.dtype)
+
+    # sliding_window_view puts the window axis last: (n, features, window)
+    X = sliding_window_view(series, window, axis=0)[:n].transpose(0, 2, 1)
+    y = sliding_window_view(series[window:], horizon, axis=0)[:n].transpose(0, 2, 1)
+    y = y[..., 0] if features == 1 else y.reshape(n, horizon * features)
+    return X, y
+
+
+def window_count(series_length, window, horizon=1):
+    return max(0, series_length - window - horizon + 1)
+
+
+def iter_window_batches(series, window, horizon=1, batch_size=64, start=0, stop=None, shuffle=False, seed=None):
+    """Yield contiguous (X, y) batches for windows start..stop; only one batch is copied at a time."""
+    X, y = make_windows(series, window, horizon)
+    stop = len(X) if stop is None else min(stop, len(X))
+    starts = np.arange(start, stop, batch_size)
+    if shuffle:
+        np.random.default_rng(seed).shuffle(starts)
+    for lo in starts:
+        hi = min(lo + batch_size, stop)
+        yield np.ascontiguousarray(X[lo:hi], dtype=np.float32), np.ascontiguousarray(y[lo:hi], dtype=np.float32)
+
+
+def windows_dataset(series, window, horizon=1, batch_size=64, start=0, stop=None, shuffle=False, seed=None):
+    """
+    tf.data.Dataset of (X, y) batches generated lazily from `series`.
+
+    Pass the result straight to model.fit / model.predict. `start`/`stop`
+    select a range of window indices, e.g. a train/val/test split.
+    Shuffling reorders whole batches, so each batch stays a contiguous slice.
+    """
+    import tensorflow as tf
+
+    features = _as_2d(series).shape[1]
+    signature = (
+        tf.TensorSpec(shape=(None, window, features), dtype=tf.float32),
+        tf.TensorSpec(shape=(None, horizon * features), dtype=tf.float32),
+    )
+    return tf.data.Dataset.from_generator(
+        lambda: iter_window_batches(series, window, horizon, batch_size, start, stop, shuffle, seed),
+        output_signature=signature,
+    ).prefetch(tf.data.AUTOTUNE)
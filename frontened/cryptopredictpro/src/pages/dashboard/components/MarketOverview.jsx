@@ -0,0 +1,90 @@
+import React, { useState } from 'react';
+import Button from '../../../components/ui/Button';
+import Icon from '../../../components/AppIcon';
+import { getBatchPredictions, getSupportedCryptos, formatINRPrice } from '../../../services/predictionApi';
+
+const MarketOverview = ({ onPredicted }) => {
+  const [timeframe, setTimeframe] = useState('hourly');
+  const [loading, setLoading] = useState(false);
+  const [predictions, setPredictions] = useState([]);
+  const [error, setError] = useState(null);
+
+  // Every supported coin in one /predict/batch request instead of one /predict per coin
+  const handleLoad = async () => {
+    setLoading(true);
+    setError(null);
+    const pairs = getSupportedCryptos().map(coin => ({ coin, timeframe }));
+    const response = await getBatchPredictions(pairs);
+    if (response?.success) {
+      setPredictions(response.predictions || []);
+      onPredicted?.();
+    } else {
+      setError(response?.error || 'Failed to fetch overview');
+    }
+    setLoading(false);
+  };
+
+  return (
+    <div className="mb-8 bg-card rounded-lg border border-border p-6 shadow-card">
+      <div className="flex flex-col md:flex-row md:items-center md:justify-between mb-4 gap-4">
+        <div className="flex items-center">
+          <div className="w-10 h-10 bg-primary/10 rounded-lg flex items-center justify-center mr-3">
+            <Icon name="LayoutGrid" size={20} color="var(--color-primary)" />
+          </div>
+          <div>
+            <h3 className="text-lg font-semibold text-foreground">Market Overview</h3>
+            <p className="text-sm text-muted-foreground">Next-candle prediction for every supported asset</p>
+          </div>
+        </div>
+        <div className="flex items-center space-x-2">
+          {['hourly', 'daily'].map(option => (
+            <Button
+              key={option}
+              variant={timeframe === option ? 'default' : 'outline'}
+              size="sm"
+              onClick={() => setTimeframe(option)}
+              disabled={loading}
+            >
+              {option === 'hourly' ? 'Next Hour' : 'Next Day'}
+            </Button>
+          ))}
+          <Button size="sm" onClick={handleLoad} loading={loading} iconName="RefreshCw">
+            Predict All
+          </Button>
+        </div>
+      </div>
+
+      {error && (
+        <div className="p-3 bg-error/10 border border-error/20 rounded-lg text-error text-sm">{error}</div>
+      )}
+
+      {predictions.length > 0 && (
+        <div className="grid grid-cols-2 md:grid-cols-3 lg:grid-cols-5 gap-4">
+          {predictions.map(item => {
+            const change = item.success && item.currentPrice
+              ? ((item.predictedPrice - item.currentPrice) / item.currentPrice) * 100
+              : null;
+            return (
+              <div key={`${item.coin}-${item.timeframe}`} className="p-4 bg-muted/30 rounded-lg border border-border">
+                <p className="font-bold text-foreground">{item.coin}</p>
+                {item.success ? (
+                  <>
+                    <p className="text-sm text-muted-foreground">{formatINRPrice(item.currentPrice)}</p>
+                    <p className="text-sm font-semibold text-primary">{formatINRPrice(item.predictedPrice)}</p>
+                    <p className={`text-xs font-medium ${change >= 0 ? 'text-success' : 'text-error'}`}>
+                      {change >= 0 ? '+' : ''}{change.toFixed(2)}%
+                    </p>
+                  </>
+                ) : (
+                  <p className="text-xs text-error">{item.error}</p>
+                )}
+              </div>
+            );
+          })}
+        </div>
+      )}
+    </div>
+  );
+};
+
+export default MarketOverview;
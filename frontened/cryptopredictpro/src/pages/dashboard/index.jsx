@@ -7,6 +7,7 @@ import PredictionControls from './components/PredictionControls';
 import PredictionChart from './components/PredictionChart';
 import PredictionSummary from './components/PredictionSummary';
 import DashboardStats from './components/DashboardStats';
+import MarketOverview from './components/MarketOverview';
 import Icon from '../../components/AppIcon';
 import { getLivePrediction, formatINRPrice, getUserStats } from '../../services/predictionApi';
 
@@ -141,6 +142,9 @@ const Dashboard = () => {
             lastActivity={stats.history.length > 0 ? `Last: ${stats.history[0].coin} (${new Date(stats.history[0].timestamp).toLocaleTimeString()})` : "No predictions yet"}
           />
 
+          {/* All assets in one batch request */}
+          <MarketOverview onPredicted={fetchStats} />
+
           {/* Error Display */}
           {error && (
             <div className="mb-6 p-4 bg-error/10 border border-error/20 rounded-lg text-error flex items-center">
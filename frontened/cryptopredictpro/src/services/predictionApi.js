@@ -55,6 +55,25 @@ export const fetchBinanceData = async (symbol = "BTCUSDT", interval = "1h", look
   }
 };
 
+/**
+ * Fetches close prices for charts from the backend's precomputed history cache.
+ * The response carries an ETag, so repeat calls are answered by the browser cache / a 304.
+ * Returns [{ timestamp: Date, close }] or [] on failure.
+ */
+export const fetchHistory = async (coin, timeframe = "hourly", { candles, points } = {}) => {
+  try {
+    const params = {};
+    if (candles) params.candles = candles;
+    if (points) params.points = points;
+    const response = await axios.get(`${API_BASE_URL}/history/${coin.toUpperCase()}/${timeframe}`, { params });
+    const { timestamps = [], prices = [] } = response.data || {};
+    return timestamps.map((ts, i) => ({ timestamp: new Date(ts * 1000), close: prices[i] }));
+  } catch (error) {
+    console.error('History error:', error);
+    return [];
+  }
+};
+
 /**
  * Simulates Google Login and persists user in backend
  */
@@ -162,20 +181,24 @@ export const getLivePrediction = async (coin, timeframe) => {
     const payload = {
       coin: coin.toUpperCase(),
       timeframe: timeframe.type === 'hourly' ? 'hourly' : 'daily',
+      horizon: timeframe.value,
       user_id: savedUser.id || 'anonymous'
     };
 
-    // Call real Flask backend
-    const response = await axios.post(`${API_BASE_URL}/predict`, payload, { timeout: 30000 });
+    // Call real Flask backend; chart candles come from the cached /history endpoint in parallel
+    const [response, history] = await Promise.all([
+      axios.post(`${API_BASE_URL}/predict`, payload, { timeout: 30000 }),
+      fetchHistory(payload.coin, payload.timeframe, { candles: 60 })
+    ]);
     const data = response.data;
 
     if (!data.success) {
       throw new Error(data.error || 'Backend failed to generate prediction');
     }
 
-    // Use historical data from backend instead of fetching again from Binance
+    // Fall back to the window embedded in the prediction if /history failed
     // Use optional chaining and default to empty array to prevent "map of undefined"
-    const historicalData = (data.historicalData || []).map(price => ({
+    const historicalData = history.length ? history : (data.historicalData || []).map(price => ({
       close: price
     }));
 
@@ -220,6 +243,29 @@ export const getLivePrediction = async (coin, timeframe) => {
   }
 };
 
+/**
+ * Fetches predictions for several coins in one request (e.g. an overview of all assets)
+ * pairs: [{ coin: 'BTC', timeframe: 'hourly' }, ...]
+ */
+export const getBatchPredictions = async (pairs) => {
+  try {
+    const savedUser = JSON.parse(localStorage.getItem('cryptoUser') || '{}');
+    const payload = {
+      pairs: pairs.map(({ coin, timeframe }) => ({
+        coin: coin.toUpperCase(),
+        timeframe: timeframe === 'daily' ? 'daily' : 'hourly'
+      })),
+      user_id: savedUser.id || 'anonymous'
+    };
+
+    const response = await axios.post(`${API_BASE_URL}/predict/batch`, payload, { timeout: 30000 });
+    return response.data;
+  } catch (error) {
+    console.error('Batch prediction error:', error);
+    return { success: false, error: error.response?.data?.error || 'Failed to fetch batch predictions', predictions: [] };
+  }
+};
+
 /**
  * Get supported cryptocurrencies
  */
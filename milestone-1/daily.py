@@ -2,6 +2,11 @@ import requests
 import pandas as pd
 import time
 import sys
+import os
+
+# Shared candle conversion from the backend
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "backened"))
+from candles import records_to_frame
 
 # Ensure UTF-8 output on Windows
 try:
@@ -59,14 +64,8 @@ while True:
         print("Data block empty. Stopping.")
         break
 
-    df = pd.DataFrame(data_block)
-    df = df[["UNIT", "TIMESTAMP", "TYPE", "MARKET", "INSTRUMENT", "OPEN", "HIGH", "LOW", "CLOSE"]]
-    df["DATE"] = pd.to_datetime(df["TIMESTAMP"], unit="s")
-
-    # Convert USD to INR
-    for col in ["OPEN", "HIGH", "LOW", "CLOSE"]:
-        if col in df.columns:
-            df[col] = df[col] * usd_to_inr
+    # Convert USD to INR and add DATE in one columnar pass
+    df = records_to_frame(data_block, usd_to_inr)
 
     # Append to CSV
     df.to_csv(output_file, mode='a', index=False, header=not pd.io.common.file_exists(output_file))
@@ -1,5 +1,10 @@
-import pandas as pd
 import os
+import sys
+
+# Shared chunked cleaner from the backend
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "..", "..", "..", "backened"))
+from csv_clean import clean_file, load_manifest, save_manifest
+from merged_dataset import DAILY_DATE_FORMAT
 
 # Folder where your CSV files are stored
 folder = r"c:\Users\HP\Desktop\infosys\daily"
@@ -18,8 +23,9 @@ coins = [
     "chainlink"    # LINK
 ]
 
-# Columns to check for >= 1 INR
-price_cols = ["OPEN", "HIGH", "LOW", "CLOSE", "VOLUME"]
+# Size, mtime and content hash of every file as of its last clean
+manifest = load_manifest(folder)
+seen = set()
 
 # Process each coin
 for coin in coins:
@@ -31,18 +37,17 @@ for coin in coins:
         continue
 
     for file in coin_files:
-        file_path = os.path.join(folder, file)
-        df = pd.read_csv(file_path)
-
-        # Convert DATE column to datetime safely if exists
-        if 'DATE' in df.columns:
-            df['DATE'] = pd.to_datetime(df['DATE'], dayfirst=True, errors='coerce')
-            df = df.dropna(subset=['DATE'])
-
-        # Keep only rows where all OHLC and VOLUME values are >= 1
-        df_filtered = df[(df[price_cols] >= 1).all(axis=1)]
-
-        # Overwrite the same file
-        df_filtered.to_csv(file_path, index=False)
-
-        print(f"{file} filtered and overwritten ({len(df_filtered)} rows kept).")
+        # "bitcoin" also matches bitcoin_cash files
+        if file in seen:
+            continue
+        seen.add(file)
+
+        # Stream OHLC/VOLUME >= 1 and DATE checks; unchanged files are not read,
+        # appended rows are cleaned on their own, everything else goes through a temp file
+        status, rows = clean_file(os.path.join(folder, file), manifest, DAILY_DATE_FORMAT)
+        save_manifest(folder, manifest)
+
+        if status == "unchanged":
+            print(f"{file} unchanged since last clean. Skipped.")
+        else:
+            print(f"{file} filtered ({status}, {rows if rows is not None else 'unknown'} rows kept).")
@@ -1,44 +1,26 @@
-import pandas as pd
 import os
+import sys
+
+# Shared streaming merge from the backend
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "..", "..", "..", "backened"))
+from merged_dataset import merge_csv_files, HOURLY_DATE_FORMAT
 
 # Folder where CSVs are stored
 folder = r"c:\Users\HP\Desktop\infosys\hourly"
 
 # Pattern to identify hourly CSVs
-csv_files = [f for f in os.listdir(folder) if f.endswith("_hourly.csv")]
+csv_files = [os.path.join(folder, f) for f in sorted(os.listdir(folder)) if f.endswith("_hourly.csv")]
 
 if not csv_files:
     print("No hourly CSV files found in the folder. Exiting.")
     exit()
 
-dfs = []
-
-for file in csv_files:
-    file_path = os.path.join(folder, file)
-    df = pd.read_csv(file_path)
-
-    # Infer cryptocurrency name from filename (before _inr_hourly.csv)
-    coin_name = file.split("_")[0].capitalize()
-    df['Cryptocurrency'] = coin_name
-
-    dfs.append(df)
-    print(f"Loaded {file} with {len(df)} rows.")
-
-# Merge all dataframes
-merged_df = pd.concat(dfs, ignore_index=True)
-
-# Convert DATE column to datetime safely
-if 'DATE' in merged_df.columns:
-    merged_df['DATE'] = pd.to_datetime(merged_df['DATE'], dayfirst=True, errors='coerce')
-    merged_df = merged_df.dropna(subset=['DATE'])  # remove rows with invalid dates
-    merged_df.sort_values(by=['DATE', 'Cryptocurrency'], inplace=True)
-
-# Filter out rows where any price column < 1 INR
-price_cols = ["OPEN", "HIGH", "LOW", "CLOSE"]
-merged_df = merged_df[(merged_df[price_cols] >= 1).all(axis=1)]
+# --incremental appends only each coin's rows newer than its last TIMESTAMP in the merged file
+incremental = "--incremental" in sys.argv
 
-# Save merged and filtered CSV
+# Stream every coin file, drop rows where any price column < 1 INR and
+# k-way merge by (TIMESTAMP, Cryptocurrency) without loading full histories
 output_file = os.path.join(folder, "all_crypto_inr_hourly_merged.csv")
-merged_df.to_csv(output_file, index=False)
+written = merge_csv_files(csv_files, output_file, date_format=HOURLY_DATE_FORMAT, incremental=incremental)
 
-print(f"All CSVs merged, filtered, and saved as {output_file} with {len(merged_df)} rows.")
+print(f"{len(csv_files)} CSVs merged, filtered, and {'appended to' if incremental else 'saved as'} {output_file} ({written} rows written).")
@@ -1,10 +1,15 @@
 import os
+import sys
 import requests
 import numpy as np
 import pandas as pd
 import tensorflow as tf
 from datetime import datetime
-from sklearn.preprocessing import MinMaxScaler
+
+# Share the backend's inference engine
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "backened"))
+from inference import load_compiled_model
+from scaling import AffineScaler, load_scaler
 
 # ----------------------------
 # Binance API (USDT pairs only)
@@ -42,6 +47,7 @@ TIMEFRAMES = {}
 for h in range(1, 24):
     TIMEFRAMES[f"Next {h} Hour" if h == 1 else f"Next {h} Hours"] = {
         "interval": "1h",
+        "steps": h,
         "model_dir": "infosys/outputs/models/hourly"
     }
 
@@ -49,6 +55,7 @@ for h in range(1, 24):
 for d in range(1, 31):
     TIMEFRAMES[f"Next {d} Day" if d == 1 else f"Next {d} Days"] = {
         "interval": "1d",
+        "steps": d,
         "model_dir": "infosys/outputs/models/daily"
     }
 # ----------------------------
@@ -70,6 +77,22 @@ MODEL_NAME_MAP = {
 # ----------------------------
 # Prediction
 # ----------------------------
+# Compiled models and their training scalers by path, loaded on first use
+_models = {}
+_scalers = {}
+
+def get_model(model_path):
+    if model_path not in _models:
+        _models[model_path] = load_compiled_model(model_path)
+    return _models[model_path]
+
+def get_scaler(model_path):
+    """Training scaler saved next to the model (outputs/scalers/...), None if missing."""
+    if model_path not in _scalers:
+        scaler_path = model_path.replace(os.path.join("outputs", "models"), os.path.join("outputs", "scalers"))
+        _scalers[model_path] = load_scaler(os.path.splitext(scaler_path)[0] + ".joblib")
+    return _scalers[model_path]
+
 def get_live_prediction(coin="BTC", timeframe="Next 1 Hour"):
     if timeframe not in TIMEFRAMES:
         raise ValueError(f"Invalid timeframe. Choose from: {list(TIMEFRAMES.keys())}")
@@ -79,6 +102,7 @@ def get_live_prediction(coin="BTC", timeframe="Next 1 Hour"):
 
     tf_info = TIMEFRAMES[timeframe]
     interval = tf_info["interval"]
+    steps = tf_info["steps"]
     model_dir = tf_info["model_dir"]
 
     binance_symbol = MODEL_NAME_MAP[coin.upper()]["binance"]
@@ -88,30 +112,35 @@ def get_live_prediction(coin="BTC", timeframe="Next 1 Hour"):
     if not os.path.exists(model_path):
         raise FileNotFoundError(f"Model not found at {model_path}")
 
-    # Load trained model
-    model = tf.keras.models.load_model(model_path)
+    # Load trained model (cached, compiled for single-call inference)
+    model = get_model(model_path)
 
     # Fetch live data (from Binance in USDT, converted to INR)
     df = fetch_binance_data(symbol=binance_symbol, interval=interval, lookback="200")
     close_prices = df["close"].values.reshape(-1, 1)
 
-    # Scale
-    scaler = MinMaxScaler(feature_range=(0, 1))
-    scaled_data = scaler.fit_transform(close_prices)
+    # Scale with the training-time scaler; fit on the fetched window only if it is missing
+    scaler = get_scaler(model_path)
+    if scaler is None:
+        print(f"⚠️ No training scaler for {model_filename}, fitting one on the live window")
+        scaler = AffineScaler.fit(close_prices)
+    scaled_data = scaler.transform(close_prices)
 
     # Prepare last 60 timesteps
     X_test = [scaled_data[-60:]]
     X_test = np.array(X_test).reshape((1, 60, 1))
 
-    # Prediction
-    predicted_scaled = model.predict(X_test)
-    predicted_price = scaler.inverse_transform(predicted_scaled)[0][0]
+    # Prediction: full path over the requested horizon
+    predicted_scaled = model.forecast(X_test, steps)
+    predicted_path = scaler.inverse_transform(predicted_scaled.reshape(-1, 1)).ravel()
+    predicted_price = predicted_path[-1]
 
     return {
         "coin": coin,
         "timeframe": timeframe,
         "last_price": float(close_prices[-1][0]),
         "predicted_price": float(predicted_price),
+        "predicted_path": predicted_path.tolist(),
         "timestamp": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
         "model_used": os.path.basename(model_path),
     }
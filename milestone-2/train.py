@@ -0,0 +1,330 @@
+"""
+Headless multi-coin LSTM training, extracted from infosys/cryptolstm.ipynb.
+
+Every coin file is an independent job in a process pool. Each worker caps
+TensorFlow's intra/inter-op thread pools, so N workers split the CPU instead
+of each one spinning up a thread per core. Outputs keep the notebook layout:
+
+    <output_dir>/models/<freq>/<COIN>.keras
+    <output_dir>/scalers/<freq>/<COIN>.joblib
+    <output_dir>/predictions/<freq>/<COIN>.csv
+    <output_dir>/metrics/<freq>/metrics.csv
+
+Inputs default to the cleaned per-coin CSVs in infosys/cleaned data, whose
+names (bitcoin_inr, chainlink_coin_inr, ...) are the ones app.py loads; the
+merged multi-coin files there are skipped (--exclude).
+
+Usage:
+    python milestone-2/train.py                          # all daily + hourly files
+    python milestone-2/train.py --jobs 8 --intra-op-threads 2
+    python milestone-2/train.py --freq hourly --pattern "bitcoin_*.csv" --epochs 5
+"""
+import argparse
+import fnmatch
+import glob
+import multiprocessing
+import os
+import re
+import sys
+import time
+import warnings
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import numpy as np
+import pandas as pd
+
+# Share the backend's windowing helpers
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "backened"))
+from windowing import make_windows
+from evaluation import inverse_scale, metrics_row
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DEFAULT_DAILY_DIR = os.path.join(BASE_DIR, "milestone-2", "infosys", "cleaned data", "daily")
+DEFAULT_HOURLY_DIR = os.path.join(BASE_DIR, "milestone-2", "infosys", "cleaned data", "hourly")
+DEFAULT_OUTPUT_DIR = os.path.join(BASE_DIR, "milestone-2", "infosys", "outputs")
+
+# -----------------------------
+# Helpers
+# -----------------------------
+
+TIMESTAMP_CANDIDATES = ["timestamp", "date", "datetime", "time"]
+TARGET_CANDIDATES = ["close", "adj close", "price", "close_price", "closing price", "close*"]
+
+
+def find_first_column(df: pd.DataFrame, candidates):
+    cols_lower = {c.lower(): c for c in df.columns}
+    for name in candidates:
+        if name in cols_lower:
+            return cols_lower[name]
+    for name in candidates:
+        base = name.replace("*", "").strip()
+        for c in df.columns:
+            if c.lower().startswith(base):
+                return c
+    return None
+
+
+def coin_from_filename(path: str) -> str:
+    name = os.path.splitext(os.path.basename(path))[0]
+    name = re.sub(r'(_daily|_hourly)$', "", name, flags=re.IGNORECASE)
+    return name.upper()
+
+
+def read_series(path: str, timestamp_col=None, target_col=None):
+    df = pd.read_csv(path)
+    if timestamp_col is None:
+        timestamp_col = find_first_column(df, TIMESTAMP_CANDIDATES)
+    if target_col is None:
+        target_col = find_first_column(df, TARGET_CANDIDATES)
+    if timestamp_col is None or target_col is None:
+        raise ValueError(f"Could not auto-detect timestamp/target in {path}. Columns={list(df.columns)}")
+    df[timestamp_col] = pd.to_datetime(df[timestamp_col], errors='coerce')
+    df = df.dropna(subset=[timestamp_col])
+    df = df.sort_values(timestamp_col).reset_index(drop=True)
+    s = df[target_col].astype(float).values.reshape(-1, 1)
+    ts = df[timestamp_col].values
+    return ts, s, timestamp_col, target_col
+
+
+def train_val_test_split(X, y, val_size=0.15, test_size=0.15):
+    n = len(X)
+    n_test = int(n * test_size)
+    n_val = int((n - n_test) * val_size)
+    train_end = n - n_test - n_val
+    val_end = n - n_test
+    return X[:train_end], y[:train_end], X[train_end:val_end], y[train_end:val_end], X[val_end:], y[val_end:]
+
+
+def build_model(window: int, features: int, horizon: int, lr: float = 1e-3):
+    import tensorflow as tf
+    from tensorflow.keras.models import Sequential
+    from tensorflow.keras.layers import LSTM, Dense, Dropout, Input
+
+    model = Sequential([
+        Input(shape=(window, features)),
+        LSTM(64, return_sequences=True),
+        Dropout(0.2),
+        LSTM(32),
+        Dense(horizon)
+    ])
+    model.compile(optimizer=tf.keras.optimizers.Adam(learning_rate=lr), loss="mse")
+    return model
+
+
+def ensure_dir(path):
+    os.makedirs(path, exist_ok=True)
+
+# -----------------------------
+# Worker
+# -----------------------------
+
+
+def init_worker(intra_op_threads, inter_op_threads):
+    """Cap TensorFlow's thread pools; must run before TF executes anything in this process."""
+    os.environ["TF_NUM_INTRAOP_THREADS"] = str(intra_op_threads)
+    os.environ["TF_NUM_INTEROP_THREADS"] = str(inter_op_threads)
+    os.environ["OMP_NUM_THREADS"] = str(intra_op_threads)
+    os.environ.setdefault("TF_CPP_MIN_LOG_LEVEL", "2")
+    warnings.filterwarnings("ignore")
+
+    import tensorflow as tf
+    tf.config.threading.set_intra_op_parallelism_threads(intra_op_threads)
+    tf.config.threading.set_inter_op_parallelism_threads(inter_op_threads)
+
+
+def train_coin(path, freq, args):
+    """Train one coin file; returns its metrics row, or None if it was skipped."""
+    import tensorflow as tf
+    from tensorflow.keras.callbacks import EarlyStopping, ModelCheckpoint, ReduceLROnPlateau
+    from sklearn.preprocessing import MinMaxScaler
+    from joblib import dump
+
+    coin = coin_from_filename(path)
+    out_model_dir = os.path.join(args.output_dir, "models", freq)
+    out_scaler_dir = os.path.join(args.output_dir, "scalers", freq)
+    out_pred_dir = os.path.join(args.output_dir, "predictions", freq)
+    for d in (out_model_dir, out_scaler_dir, out_pred_dir):
+        ensure_dir(d)
+
+    try:
+        ts, s, tcol, ycol = read_series(path, args.timestamp_col, args.target_col)
+    except Exception as e:
+        print(f"[{freq}] {coin}: ERROR reading file -> {e}", flush=True)
+        return None
+
+    scaler = MinMaxScaler()
+    s_scaled = scaler.fit_transform(s)
+
+    X, y = make_windows(s_scaled, args.window, args.horizon)
+    if len(X) < 10:
+        print(f"[{freq}] {coin}: not enough data. Skipping.", flush=True)
+        return None
+
+    X_train, y_train, X_val, y_val, X_test, y_test = train_val_test_split(X, y, args.val_size, args.test_size)
+
+    tf.keras.backend.clear_session()
+    ckpt_path = os.path.join(out_model_dir, f"{coin}.keras")
+    if os.path.exists(ckpt_path) and not args.fresh:
+        print(f"[{freq}] {coin}: Resuming training from saved checkpoint...", flush=True)
+        model = tf.keras.models.load_model(ckpt_path)
+    else:
+        print(f"[{freq}] {coin}: Starting new training...", flush=True)
+        model = build_model(args.window, X.shape[-1], args.horizon, lr=args.learning_rate)
+
+    callbacks = [
+        EarlyStopping(monitor="val_loss", patience=args.patience, restore_best_weights=True),
+        ReduceLROnPlateau(monitor="val_loss", factor=0.5, patience=max(2, args.patience // 2), verbose=0),
+        ModelCheckpoint(ckpt_path, monitor="val_loss", save_best_only=True, save_freq="epoch")
+    ]
+
+    model.fit(
+        X_train, y_train,
+        validation_data=(X_val, y_val),
+        epochs=args.epochs,
+        batch_size=args.batch_size,
+        verbose=2 if args.jobs == 1 else 0,
+        callbacks=callbacks
+    )
+
+    # Whole (windows, horizon) matrices in one affine transform, all horizons scored at once
+    y_pred_val = inverse_scale(model.predict(X_val, verbose=0), scaler)
+    y_pred_test = inverse_scale(model.predict(X_test, verbose=0), scaler)
+    y_val_inv, y_test_inv = inverse_scale(y_val, scaler), inverse_scale(y_test, scaler)
+
+    m_val = metrics_row(y_val_inv, y_pred_val, prefix="val_")
+    m_test = metrics_row(y_test_inv, y_pred_test, prefix="test_")
+
+    row = {"freq": freq, "coin": coin, "window": args.window, "horizon": args.horizon}
+    row.update(m_val)
+    row.update(m_test)
+
+    dump(scaler, os.path.join(out_scaler_dir, f"{coin}.joblib"))
+    pred_df = pd.DataFrame({
+        "set": ["val"] * len(y_val_inv) + ["test"] * len(y_test_inv),
+        "y_true": np.concatenate([y_val_inv[:, 0], y_test_inv[:, 0]]),
+        "y_pred": np.concatenate([y_pred_val[:, 0], y_pred_test[:, 0]])
+    })
+    pred_df.to_csv(os.path.join(out_pred_dir, f"{coin}.csv"), index=False)
+
+    print(f"[{freq}] {coin}: done. val_RMSE={m_val['val_RMSE']:.4f} test_RMSE={m_test['test_RMSE']:.4f}", flush=True)
+    return row
+
+# -----------------------------
+# Scheduling
+# -----------------------------
+
+
+def collect_jobs(args):
+    """(path, freq) per coin file, largest first so the longest fits start early."""
+    jobs = []
+    for freq in args.freq:
+        data_dir = args.daily_dir if freq == "daily" else args.hourly_dir
+        if not os.path.isdir(data_dir):
+            print(f"[{freq}] Directory not found: {data_dir}")
+            continue
+        files = sorted(
+            f for f in glob.glob(os.path.join(data_dir, args.pattern))
+            if not any(fnmatch.fnmatch(os.path.basename(f), exclude) for exclude in args.exclude)
+        )
+        if not files:
+            print(f"[{freq}] No CSV files found in {data_dir}")
+        jobs.extend((f, freq) for f in files)
+    return sorted(jobs, key=lambda job: os.path.getsize(job[0]), reverse=True)
+
+
+def write_metrics(rows, output_dir):
+    for freq in sorted({row["freq"] for row in rows}):
+        metrics_dir = os.path.join(output_dir, "metrics", freq)
+        ensure_dir(metrics_dir)
+        freq_rows = sorted((row for row in rows if row["freq"] == freq), key=lambda row: row["coin"])
+        pd.DataFrame(freq_rows).to_csv(os.path.join(metrics_dir, "metrics.csv"), index=False)
+        print(f"[{freq}] Metrics saved -> {metrics_dir}/metrics.csv")
+
+
+def run_jobs(jobs, args):
+    rows = []
+    if args.jobs == 1:
+        init_worker(args.intra_op_threads, args.inter_op_threads)
+        for path, freq in jobs:
+            row = train_coin(path, freq, args)
+            if row:
+                rows.append(row)
+        return rows
+
+    # spawn, not fork: TensorFlow's runtime is not fork-safe
+    context = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(
+        max_workers=args.jobs,
+        mp_context=context,
+        initializer=init_worker,
+        initargs=(args.intra_op_threads, args.inter_op_threads),
+    ) as executor:
+        futures = {executor.submit(train_coin, path, freq, args): (path, freq) for path, freq in jobs}
+        for future in as_completed(futures):
+            path, freq = futures[future]
+            try:
+                row = future.result()
+            except Exception as e:
+                print(f"[{freq}] {coin_from_filename(path)}: ERROR during training -> {e}", flush=True)
+                continue
+            if row:
+                rows.append(row)
+    return rows
+
+# -----------------------------
+# Main
+# -----------------------------
+
+
+def parse_args(argv=None):
+    cpus = os.cpu_count() or 1
+    p = argparse.ArgumentParser(description="Train per-coin LSTM models in parallel.")
+    p.add_argument("--daily_dir", type=str, default=DEFAULT_DAILY_DIR)
+    p.add_argument("--hourly_dir", type=str, default=DEFAULT_HOURLY_DIR)
+    p.add_argument("--output_dir", type=str, default=DEFAULT_OUTPUT_DIR)
+    p.add_argument("--freq", nargs="+", choices=["daily", "hourly"], default=["daily", "hourly"])
+    p.add_argument("--pattern", type=str, default="*.csv")
+    p.add_argument("--exclude", nargs="*", default=["*_merged.csv"], help="file patterns to skip")
+    p.add_argument("--timestamp_col", type=str, default=None)
+    p.add_argument("--target_col", type=str, default=None)
+    p.add_argument("--window", type=int, default=60)
+    p.add_argument("--horizon", type=int, default=1)
+    p.add_argument("--val_size", type=float, default=0.15)
+    p.add_argument("--test_size", type=float, default=0.15)
+    p.add_argument("--epochs", type=int, default=50)
+    p.add_argument("--batch_size", type=int, default=64)
+    p.add_argument("--learning_rate", type=float, default=1e-3)
+    p.add_argument("--patience", type=int, default=5)
+    p.add_argument("--fresh", action="store_true", help="ignore saved checkpoints and train from scratch")
+    p.add_argument("--jobs", type=int, default=None, help="worker processes (default: cores / intra-op threads)")
+    p.add_argument("--intra-op-threads", type=int, default=2, help="TensorFlow intra-op threads per worker")
+    p.add_argument("--inter-op-threads", type=int, default=1, help="TensorFlow inter-op threads per worker")
+    args = p.parse_args(argv)
+    if args.jobs is None:
+        args.jobs = max(1, cpus // args.intra_op_threads)
+    return args
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    ensure_dir(args.output_dir)
+
+    jobs = collect_jobs(args)
+    args.jobs = max(1, min(args.jobs, len(jobs) or 1))
+
+    print("=== LSTM Crypto Training ===")
+    print(f"daily_dir  : {args.daily_dir}")
+    print(f"hourly_dir : {args.hourly_dir}")
+    print(f"output_dir : {args.output_dir}")
+    print(f"jobs       : {len(jobs)} files on {args.jobs} workers x {args.intra_op_threads} intra-op threads")
+
+    started = time.perf_counter()
+    rows = run_jobs(jobs, args)
+    if rows:
+        write_metrics(rows, args.output_dir)
+
+    print(f"Done. {len(rows)}/{len(jobs)} models trained in {time.perf_counter() - started:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
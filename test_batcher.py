@@ -0,0 +1,83 @@
+"""
+Tests the micro-batcher's queueing decisions with a fake model.
+
+Usage: python test_batcher.py
+"""
+import os
+import sys
+import threading
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "backened"))
+
+from batcher import MicroBatcher
+
+
+class SlowModel:
+    def __init__(self, seconds):
+        self.seconds = seconds
+        self.batches = []
+
+    def predict(self, X):
+        self.batches.append(len(X))
+        time.sleep(self.seconds)
+        return X[:, -1, :] * 2
+
+
+def window(value):
+    return np.full((1, 60, 1), value, dtype=np.float32)
+
+
+def test_queued_request_does_not_wait_for_direct_one():
+    """B queues behind A's direct call; A never joins a batch, so B mustn't sit out max_wait."""
+    batcher = MicroBatcher(max_batch_size=32, max_wait_ms=1000)
+    model = SlowModel(0.2)
+    results = {}
+
+    def call(name, value):
+        started = time.perf_counter()
+        results[name] = (batcher.predict("k", model, window(value)), time.perf_counter() - started)
+
+    a = threading.Thread(target=call, args=("a", 1))
+    a.start()
+    time.sleep(0.05)  # A is inside model.predict on the direct path
+    b = threading.Thread(target=call, args=("b", 2))
+    b.start()
+    a.join()
+    b.join()
+
+    assert results["a"][0][0, 0] == 2 and results["b"][0][0, 0] == 4
+    assert results["b"][1] < 0.6, f"queued request waited {results['b'][1]:.2f}s"
+    assert model.batches == [1, 1]
+
+
+def test_concurrent_requests_share_a_batch():
+    batcher = MicroBatcher(max_batch_size=32, max_wait_ms=20)
+    model = SlowModel(0.01)
+    results = {}
+
+    def call(i):
+        results[i] = batcher.predict("k", model, window(i))
+
+    threads = [threading.Thread(target=call, args=(i,)) for i in range(20)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert all(results[i][0, 0] == 2 * i for i in range(20))
+    assert len(model.batches) < 20 and sum(model.batches) == 20
+
+
+if __name__ == "__main__":
+    failed = 0
+    for test in (test_queued_request_does_not_wait_for_direct_one, test_concurrent_requests_share_a_batch):
+        try:
+            test()
+            print(f"✅ {test.__name__} passed")
+        except AssertionError as e:
+            failed += 1
+            print(f"❌ {test.__name__} failed: {e}")
+    sys.exit(1 if failed else 0)
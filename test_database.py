@@ -0,0 +1,127 @@
+"""
+Tests the connection pool, the write-behind queue and the trigger-maintained
+user stats on a throwaway database.
+
+Usage: python -m pytest test_database.py
+"""
+import os
+import sqlite3
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "backened"))
+
+import database
+
+
+@pytest.fixture
+def db_path(tmp_path, monkeypatch):
+    path = str(tmp_path / "crypto_pro.db")
+    monkeypatch.setattr(database, "DB_PATH", path)
+    conn = database.get_db_connection()
+    conn.execute("CREATE TABLE t (v INTEGER)")
+    conn.commit()
+    conn.close()
+    return path
+
+
+def values(path):
+    with sqlite3.connect(path) as conn:
+        return [row[0] for row in conn.execute("SELECT v FROM t ORDER BY v")]
+
+
+def test_pool_reuses_returned_connections(db_path, monkeypatch):
+    monkeypatch.setattr(database, "DB_POOL_SIZE", 1)
+    monkeypatch.setattr(database, "_pool", None)
+    first, second = database.get_db_connection(), database.get_db_connection()
+    assert first is not second
+    first.close()
+    second.close()  # past DB_POOL_SIZE: disconnected, not kept
+    with pytest.raises(sqlite3.ProgrammingError):
+        second.execute("SELECT 1")
+    assert database.get_db_connection() is first
+
+
+def test_returned_connection_is_rolled_back(db_path):
+    conn = database.get_db_connection()
+    conn.execute("INSERT INTO t VALUES (1)")
+    conn.close()
+    conn.close()  # a second close is a no-op
+    reused = database.get_db_connection()
+    assert reused is conn and not reused.in_transaction
+    reused.close()
+    assert values(db_path) == []
+
+
+def test_failed_batch_does_not_stop_the_writer(db_path, monkeypatch):
+    connect = database.get_db_connection
+    broken = True
+
+    def flaky_connection():
+        if broken:
+            raise RuntimeError("injected failure")
+        return connect()
+
+    monkeypatch.setattr(database, "get_db_connection", flaky_connection)
+    log = database.WriteBehindQueue("INSERT INTO t VALUES (?)", max_delay=0.01)
+    log.submit([(1,), (2,), (3,)])
+    assert log.flush()
+    assert log.dropped == 3 and log._thread.is_alive()
+
+    broken = False
+    log.submit([(4,), (5,)])
+    assert log.flush()
+    assert values(db_path) == [4, 5]
+    assert log.dropped == 3
+
+
+@pytest.fixture
+def stats_conn(tmp_path, monkeypatch):
+    monkeypatch.setattr(database, "DB_PATH", str(tmp_path / "crypto_pro.db"))
+    database.init_db()
+    conn = database.get_db_connection()
+    yield conn
+    conn.close()
+
+
+def predict(conn, user_id, count):
+    conn.executemany(
+        "INSERT INTO predictions (user_id, coin, timeframe, timestamp) VALUES (?, 'BTC', 'hourly', '2026-10-18')",
+        [(user_id,)] * count,
+    )
+    conn.commit()
+
+
+def ring(conn, user_id):
+    return sorted(row[0] for row in conn.execute(
+        "SELECT prediction_id FROM user_recent_predictions WHERE user_id = ?", (user_id,)))
+
+
+def latest(conn, user_id, n=database.RECENT_PREDICTIONS):
+    return sorted(row[0] for row in conn.execute(
+        "SELECT id FROM predictions WHERE user_id = ? ORDER BY id DESC LIMIT ?", (user_id, n)))
+
+
+def test_ring_evicts_the_oldest_prediction(stats_conn):
+    predict(stats_conn, "u1", database.RECENT_PREDICTIONS + 5)
+    predict(stats_conn, "u2", 3)
+    assert ring(stats_conn, "u1") == latest(stats_conn, "u1")
+    assert ring(stats_conn, "u2") == latest(stats_conn, "u2")
+
+    stats_conn.execute("UPDATE predictions SET is_correct = 1 WHERE id = ?", (latest(stats_conn, "u1")[-1],))
+    stats_conn.commit()
+    row = stats_conn.execute("SELECT total, scored, correct FROM user_stats WHERE user_id = 'u1'").fetchone()
+    assert tuple(row) == (database.RECENT_PREDICTIONS + 5, 1, 1)
+
+
+def test_ring_reuses_slots_freed_by_deletes(stats_conn):
+    predict(stats_conn, "u1", database.RECENT_PREDICTIONS + 5)
+    stats_conn.execute("DELETE FROM predictions WHERE id IN (?, ?)", tuple(latest(stats_conn, "u1")[-2:]))
+    stats_conn.commit()
+    assert len(ring(stats_conn, "u1")) == database.RECENT_PREDICTIONS - 2
+
+    predict(stats_conn, "u1", 3)
+    assert ring(stats_conn, "u1") == latest(stats_conn, "u1")
+    slots = [row[0] for row in stats_conn.execute("SELECT slot FROM user_recent_predictions WHERE user_id = 'u1'")]
+    assert sorted(slots) == list(range(database.RECENT_PREDICTIONS))
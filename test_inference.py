@@ -0,0 +1,68 @@
+"""
+Tests CompiledModel.forecast() against a plain sliding-window rollout with
+model.predict, on served models and on a small multi-output model.
+
+Usage: python test_inference.py
+"""
+import os
+import sys
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "backened"))
+
+import keras
+
+from inference import CompiledModel
+
+MODEL_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "milestone-2", "infosys", "outputs", "models")
+# Scaled units (prices are scaled to ~[0, 1]); float32 noise is ~1e-6
+TOLERANCE = 1e-4
+
+
+def sliding_rollout(model, X, steps):
+    """Reference: predict, slide the outputs into the window, repeat."""
+    window, path = X.copy(), []
+    while len(path) < steps:
+        y = model.predict(window, verbose=0)
+        path.extend(y.T)
+        window = np.concatenate([window[:, y.shape[1]:, :], y[:, :, None]], axis=1)
+    return np.stack(path, axis=1)[:, :steps]
+
+
+def windows(batch, shape, seed=0):
+    return np.random.default_rng(seed).uniform(0.2, 0.8, (batch,) + shape).astype(np.float32)
+
+
+def check(model, batch, steps):
+    compiled = CompiledModel(model)
+    X = windows(batch, compiled.input_shape)
+    got = compiled.forecast(X, steps)
+    want = sliding_rollout(model, X, steps)
+    assert got.shape == (batch, steps), got.shape
+    diff = np.abs(got - want).max()
+    assert diff < TOLERANCE, f"max |diff| {diff:.2e}"
+
+
+def test_served_models_match_sliding_rollout():
+    for name in ("hourly/BITCOIN_INR.keras", "daily/ALL_CRYPTO_INR_HOURLY_MERGED.keras"):
+        check(keras.models.load_model(os.path.join(MODEL_DIR, name)), batch=3, steps=30)
+
+
+def test_multi_output_model_matches_sliding_rollout():
+    keras.utils.set_random_seed(0)
+    model = keras.Sequential([keras.Input((20, 1)), keras.layers.LSTM(8), keras.layers.Dense(3)])
+    check(model, batch=1, steps=10)
+    check(model, batch=5, steps=2)  # within the native horizon: no rollout
+
+
+if __name__ == "__main__":
+    failed = 0
+    for test in (test_served_models_match_sliding_rollout, test_multi_output_model_matches_sliding_rollout):
+        try:
+            test()
+            print(f"✅ {test.__name__} passed")
+        except AssertionError as e:
+            failed += 1
+            print(f"❌ {test.__name__} failed: {e}")
+    sys.exit(1 if failed else 0)
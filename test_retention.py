@@ -0,0 +1,103 @@
+"""
+Tests retention.run_retention on a throwaway database: expired rows move to
+the monthly archives and the daily rollup, and a failed batch leaves the hot
+database untouched.
+
+Usage: python -m pytest test_retention.py
+"""
+import os
+import sqlite3
+import sys
+from datetime import datetime, timedelta
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "backened"))
+
+import database
+from retention import run_retention
+
+NOW = datetime(2026, 10, 18)
+ROWS = 300
+
+
+@pytest.fixture
+def conn(tmp_path, monkeypatch):
+    monkeypatch.setattr(database, "DB_PATH", str(tmp_path / "crypto_pro.db"))
+    database.init_db()
+    conn = database.get_db_connection()
+    rows = []
+    for i in range(ROWS):
+        user = ("anonymous", "u1", "u2")[i % 3]
+        scored = (None, 0, 1)[i // 3 % 3]
+        timestamp = (NOW - timedelta(days=i * 200 / ROWS)).isoformat()
+        rows.append((user, "BTC", "hourly", 100.0, 101.0, 50, timestamp, scored, 99.0 if scored is not None else None))
+    conn.executemany(
+        "INSERT INTO predictions (user_id, coin, timeframe, current_price, predicted_price, confidence, "
+        "timestamp, is_correct, actual_price) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+        rows,
+    )
+    conn.commit()
+    yield conn
+    conn.close()
+
+
+def user_stats(conn):
+    return {row[0]: tuple(row[1:]) for row in conn.execute("SELECT user_id, total, scored, correct FROM user_stats")}
+
+
+def count(conn, sql):
+    return conn.execute(sql).fetchone()[0] or 0
+
+
+def archived_rows(archive_dir):
+    total = 0
+    for name in os.listdir(archive_dir):
+        with sqlite3.connect(os.path.join(archive_dir, name)) as archive:
+            total += archive.execute("SELECT COUNT(*) FROM predictions").fetchone()[0]
+    return total
+
+
+def test_expired_rows_move_to_archive_and_rollup(conn, tmp_path):
+    before = user_stats(conn)
+    archive_dir = str(tmp_path / "archive")
+
+    archived = run_retention(conn, now=NOW, retention_days=90, anonymous_retention_days=7,
+                             batch_size=25, archive_dir=archive_dir)
+
+    moved = sum(archived.values())
+    assert moved > 0
+    assert count(conn, "SELECT COUNT(*) FROM predictions") == ROWS - moved
+    assert count(conn, "SELECT SUM(predictions) FROM prediction_daily") == moved
+    assert archived_rows(archive_dir) == moved
+    assert user_stats(conn) == before
+    # Nothing left to do on a second run
+    assert run_retention(conn, now=NOW, retention_days=90, anonymous_retention_days=7,
+                         archive_dir=archive_dir) == {}
+
+
+def test_failed_delete_leaves_rollup_and_stats_unchanged(conn, tmp_path):
+    before = user_stats(conn)
+    archive_dir = str(tmp_path / "archive")
+    conn.execute('''
+    CREATE TRIGGER fail_delete BEFORE DELETE ON predictions
+    BEGIN SELECT RAISE(ABORT, 'injected failure'); END
+    ''')
+    conn.commit()
+
+    with pytest.raises(sqlite3.IntegrityError, match="injected failure"):
+        run_retention(conn, now=NOW, retention_days=90, anonymous_retention_days=7,
+                      batch_size=25, archive_dir=archive_dir)
+
+    assert count(conn, "SELECT COUNT(*) FROM predictions") == ROWS
+    assert count(conn, "SELECT COUNT(*) FROM prediction_daily") == 0
+    assert user_stats(conn) == before
+
+    # The archive copy already committed; a repeat run picks up where it stopped
+    conn.execute("DROP TRIGGER fail_delete")
+    conn.commit()
+    moved = sum(run_retention(conn, now=NOW, retention_days=90, anonymous_retention_days=7,
+                              batch_size=25, archive_dir=archive_dir).values())
+    assert count(conn, "SELECT SUM(predictions) FROM prediction_daily") == moved
+    assert archived_rows(archive_dir) == moved
+    assert user_stats(conn) == before
@@ -0,0 +1,241 @@
+"""
+Tests the data sync against a local stub of the CoinDesk API.
+
+The stub serves synthetic candles, answers every second request with a 429
+and can fail pages older than a given time, so retries and gap handling run
+without network access. Data goes to pytest's tmp_path and every
+data_sync global a test changes is set through monkeypatch, so the repo's
+CSVs and later tests are not touched.
+
+Usage: python test_sync.py
+"""
+import json
+import os
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+import pandas as pd
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "backened"))
+
+import data_sync
+from merged_dataset import HOURLY_DATE_FORMAT, append_frames, merge_csv_files, merged_watermarks
+from price_store import PriceSeries, import_csv
+
+HOUR = 3600
+COLUMNS = ["UNIT", "TIMESTAMP", "TYPE", "MARKET", "INSTRUMENT", "OPEN", "HIGH", "LOW", "CLOSE", "DATE"]
+
+
+class StubCoinDesk(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    requests_seen = 0
+    throttled = 0
+    fail_before_ts = None  # pages ending before this get a 500
+
+    def log_message(self, *args):
+        pass
+
+    def do_GET(self):
+        cls = type(self)
+        cls.requests_seen += 1
+        query = {k: v[0] for k, v in parse_qs(urlparse(self.path).query).items()}
+        step = HOUR if urlparse(self.path).path.endswith("hours") else 86400
+        to_ts = int(query.get("to_ts", time.time())) // step * step
+
+        if cls.requests_seen % 2 == 0:
+            cls.throttled += 1
+            self._send(429, {})
+        elif cls.fail_before_ts is not None and to_ts < cls.fail_before_ts:
+            self._send(500, {})
+        else:
+            limit = int(query["limit"])
+            records = [
+                {"TIMESTAMP": ts, "OPEN": 10.0, "HIGH": 11.0, "LOW": 9.0, "CLOSE": 10.5, "TYPE": "267", "MARKET": "cadli"}
+                for ts in range(to_ts - (limit - 1) * step, to_ts + 1, step)
+            ]
+            self._send(200, {"Data": records})
+
+    def _send(self, status, payload):
+        body = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+@pytest.fixture
+def state(tmp_path, monkeypatch):
+    """A fresh sync_state in the temp folder."""
+    path = str(tmp_path / "sync_state.json")
+    monkeypatch.setattr(data_sync, "SYNC_STATE_PATH", path)
+    monkeypatch.setattr(data_sync, "sync_state", data_sync.SyncState(path))
+    return data_sync.sync_state
+
+
+@pytest.fixture
+def stub(monkeypatch):
+    """The stub API on a free port, with its counters reset."""
+    for name, value in (("requests_seen", 0), ("throttled", 0), ("fail_before_ts", None)):
+        monkeypatch.setattr(StubCoinDesk, name, value)
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StubCoinDesk)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield server
+    server.shutdown()
+
+
+@pytest.fixture
+def sync_setup(tmp_path, monkeypatch, state, stub):
+    """Point data_sync at the stub and temp folders; returns make_csv(hours_behind)."""
+    monkeypatch.setattr(data_sync, "COINDESK_API_BASE", f"http://127.0.0.1:{stub.server_port}")
+    monkeypatch.setattr(data_sync, "SYNC_BACKOFF_SECONDS", 0.01)
+    monkeypatch.setattr(data_sync, "HOURLY_PATH", str(tmp_path / "hourly"))
+    monkeypatch.setattr(data_sync, "candle_store", data_sync.PriceStore(str(tmp_path / "store")))
+    os.makedirs(data_sync.HOURLY_PATH)
+
+    def make_csv(hours_behind):
+        """A BTC hourly CSV that ends `hours_behind` hours ago; returns (path, last_ts)."""
+        last_ts = int(time.time()) // HOUR * HOUR - hours_behind * HOUR
+        timestamps = range(last_ts - 9 * HOUR, last_ts + 1, HOUR)
+        df = pd.DataFrame([
+            ["HOUR", ts, "267", "cadli", "BTC-USD", 900.0, 950.0, 850.0, 920.0, pd.to_datetime(ts, unit="s").strftime("%d-%m-%Y %H.%M")]
+            for ts in timestamps
+        ], columns=COLUMNS)
+        file_path = os.path.join(data_sync.HOURLY_PATH, "btc_inr_hourly.csv")
+        df.to_csv(file_path, index=False)
+        return file_path, last_ts
+
+    return make_csv
+
+
+def sync_btc():
+    session = data_sync.create_session(1)
+    limiter = data_sync.RateLimiter(200)
+    return data_sync.sync_coin_data("BTC", "BTC-USD", "hours", session, limiter)
+
+
+def candles(start_ts, count):
+    return pd.DataFrame([
+        ["HOUR", ts, "267", "cadli", "X-USD", 900.0, 950.0, 850.0, 920.0, ""]
+        for ts in range(start_ts, start_ts + count * HOUR, HOUR)
+    ], columns=COLUMNS)
+
+
+def test_catch_up_with_retries(sync_setup):
+    """A catch-up spanning two pages survives 429s and leaves no gap."""
+    file_path, last_ts = sync_setup(hours_behind=3000)
+
+    appended = sync_btc()
+    df = pd.read_csv(file_path)
+    assert appended is not None and len(appended) == 3000, appended
+    assert StubCoinDesk.throttled > 0, "stub never throttled"
+    assert df["TIMESTAMP"].is_monotonic_increasing and df["TIMESTAMP"].is_unique
+    assert (df["TIMESTAMP"].diff().dropna() == HOUR).all(), "gap in appended candles"
+    assert data_sync.get_last_timestamp(file_path) == df["TIMESTAMP"].iloc[-1]
+    assert data_sync.sync_state.get(file_path)["rows"] == len(df)
+
+
+def test_failed_older_page_is_not_appended(sync_setup, monkeypatch):
+    """When an older page can't be fetched, the newer ones aren't appended either."""
+    file_path, last_ts = sync_setup(hours_behind=3000)
+    monkeypatch.setattr(StubCoinDesk, "fail_before_ts", int(time.time()) - 1500 * HOUR)
+    before = open(file_path, "rb").read()
+
+    assert sync_btc() is None
+    assert open(file_path, "rb").read() == before, "CSV changed after a failed catch-up"
+    assert data_sync.get_last_timestamp(file_path) == last_ts
+
+
+def test_last_timestamp_of_unsynced_csv_in_any_order(tmp_path, state):
+    """Without a state entry the newest candle is found whichever way the CSV is sorted."""
+    t0 = 1_700_000_000 // HOUR * HOUR
+    df = candles(t0, 300)
+    newest = t0 + 299 * HOUR
+    for name, rows in (("ascending", df), ("descending", df[::-1]), ("shuffled", df.sample(frac=1, random_state=0))):
+        file_path = str(tmp_path / f"{name}.csv")
+        rows.to_csv(file_path, index=False)
+        assert data_sync.get_last_timestamp(file_path) == newest, name
+        assert state.get(file_path)["rows"] == 300
+
+
+def test_store_catches_up_after_failed_append(sync_setup, monkeypatch):
+    """A store append that fails after the CSV write is filled in by the next sync."""
+    file_path, last_ts = sync_setup(hours_behind=5)
+    series = data_sync.candle_store.series("hourly", "btc_inr")
+    import_csv(file_path, series)
+
+    append = PriceSeries.append
+    calls = []
+
+    def failing_append(self, timestamps, ohlcv):
+        calls.append(len(timestamps))
+        if len(calls) == 1:
+            raise OSError("injected failure")
+        return append(self, timestamps, ohlcv)
+
+    monkeypatch.setattr(PriceSeries, "append", failing_append)
+    assert len(sync_btc()) == 5
+    assert series.last_timestamp() == last_ts
+
+    sync_btc()
+    df = pd.read_csv(file_path)
+    assert len(calls) == 2  # the failed append, then the catch-up import
+    assert series.range()[0].tolist() == df["TIMESTAMP"].tolist()
+
+
+def test_lagging_coin_reaches_merged_dataset(tmp_path, monkeypatch, state):
+    """A coin behind the others still gets its late rows into the merged file, once."""
+    merged_path = str(tmp_path / "all_crypto_inr_hourly_merged.csv")
+    monkeypatch.setattr(data_sync, "MERGED_FILES", {"hourly": (merged_path, HOURLY_DATE_FORMAT)})
+
+    t0 = 1_700_000_000 // HOUR * HOUR
+    merged = pd.concat([candles(t0, 5).assign(Cryptocurrency="Btc"), candles(t0, 3).assign(Cryptocurrency="Eth")])
+    merged.sort_values(["TIMESTAMP", "Cryptocurrency"]).to_csv(merged_path, index=False)
+
+    # ETH catches up on t0+3h..t0+4h while BTC moves on to t0+5h
+    report = [
+        {"coin": "BTC", "timeframe": "hourly", "appended": 1, "frame": candles(t0 + 5 * HOUR, 1)},
+        {"coin": "ETH", "timeframe": "hourly", "appended": 2, "frame": candles(t0 + 3 * HOUR, 2)},
+    ]
+    data_sync.update_merged_datasets(report)
+    data_sync.update_merged_datasets(report)  # a replay writes nothing
+
+    df = pd.read_csv(merged_path)
+    for coin, expected in (("Btc", 6), ("Eth", 5)):
+        ts = df.loc[df["Cryptocurrency"] == coin, "TIMESTAMP"]
+        assert len(ts) == expected and ts.is_unique and ts.is_monotonic_increasing, (coin, ts.tolist())
+    entry = state.get(merged_path)
+    assert entry["rows"] == len(df)
+    assert entry["coins"] == {"btc_inr": t0 + 5 * HOUR, "eth_inr": t0 + 4 * HOUR}
+
+
+def test_coins_sharing_a_prefix_keep_separate_watermarks(tmp_path):
+    """bitcoin_* and bitcoin_cash_* must not share a label or a watermark."""
+    t0 = 1_700_000_000 // HOUR * HOUR
+    btc_path = str(tmp_path / "bitcoin_inr_hourly.csv")
+    bch_path = str(tmp_path / "bitcoin_cash_inr_hourly.csv")
+    merged_path = str(tmp_path / "all_crypto_inr_hourly_merged.csv")
+    candles(t0, 5).to_csv(btc_path, index=False)
+    candles(t0, 3).to_csv(bch_path, index=False)
+    merge_csv_files([btc_path, bch_path], merged_path)
+
+    # Only Bitcoin Cash gets new rows; a shared watermark would skip them
+    candles(t0 + 3 * HOUR, 2).to_csv(bch_path, mode="a", header=False, index=False)
+    assert merge_csv_files([btc_path, bch_path], merged_path, incremental=True) == 2
+
+    watermarks = merged_watermarks(merged_path, ["bitcoin_inr", "bitcoin_cash_inr"])
+    assert watermarks == {"bitcoin_inr": t0 + 4 * HOUR, "bitcoin_cash_inr": t0 + 4 * HOUR}
+    written, skipped, watermarks = append_frames(
+        merged_path, {"bitcoin_cash_inr": candles(t0 + 4 * HOUR, 2)}, HOURLY_DATE_FORMAT, watermarks)
+    assert (written, skipped) == (1, 1)
+    assert watermarks == {"bitcoin_inr": t0 + 4 * HOUR, "bitcoin_cash_inr": t0 + 5 * HOUR}
+
+    counts = pd.read_csv(merged_path)["Cryptocurrency"].value_counts().to_dict()
+    assert counts == {"Bitcoin": 5, "Bitcoin_cash": 6}, counts
+
+
+if __name__ == "__main__":
+    sys.exit(pytest.main([__file__, "-q"]))